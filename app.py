@@ -1,14 +1,31 @@
 from fastapi import FastAPI, APIRouter
 import uvicorn
-from db.db import init_db
-from routes.author_router import router as author_router
-from routes.book_router import router as book_router
-from routes.user_router import router as user_router
+from db.db import init_db, DB_MODE
+from core.metrics import MetricsMiddleware
+from core.compression import CompressionMiddleware
+
+# DB_MODE=async sirve las mismas rutas con AsyncSession para poder comparar ambos modos
+if DB_MODE == "async":
+	from routes.async_author_router import router as author_router
+	from routes.async_book_router import router as book_router
+	from routes.async_user_router import router as user_router
+else:
+	from routes.author_router import router as author_router
+	from routes.book_router import router as book_router
+	from routes.user_router import router as user_router
+from routes.cache_router import router as cache_router
+from routes.metrics_router import router as metrics_router
 
 init_db()
 
 app = FastAPI(title="Library Management API")
 
+# Compresión gzip/br/zstd según Accept-Encoding (ver core/compression.py)
+app.add_middleware(CompressionMiddleware)
+# Server-Timing y métricas por ruta (expuestas en /metrics). Va por fuera de la
+# compresión, así que la latencia medida incluye el coste de comprimir
+app.add_middleware(MetricsMiddleware)
+
 # Router principal con prefijo /api
 api_router = APIRouter(prefix="/api")
 
@@ -16,9 +33,11 @@ api_router = APIRouter(prefix="/api")
 api_router.include_router(author_router)
 api_router.include_router(book_router)
 api_router.include_router(user_router)
+api_router.include_router(cache_router)
 
 # Incluir el router principal en la app
 app.include_router(api_router)
+app.include_router(metrics_router)
 
 def start_server():
 	uvicorn.run(
@@ -0,0 +1,140 @@
+"""Checkout/return contention benchmark.
+
+Worker threads borrow and return books from a small hot set of a temporary
+SQLite file, each operation in its own session (like one request each). Two
+strategies are compared:
+
+- atomic: book_services.checkout_book / return_book, a single conditional
+  UPDATE ... WHERE is_available = <expected> RETURNING.
+- read_modify_write: load the book, check is_available in Python, then
+  update_book(isAvailable=...), which is how availability was changed before.
+
+For each one it reports successful operations per second, conflicts, SQLite
+lock errors, latency and "double checkouts": times a thread was told it had
+borrowed a book another thread was still holding (lost updates).
+
+    python -m benchmarks.checkout_contention --threads 16 --hot-books 8 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from db.db import Base
+from db.sqlite_tuning import sqlite_pragmas, configure_sqlite
+from schemas.book_schema import UpdateBookSchema
+from services.books import book_services
+from services.exceptions import ConflictError
+from benchmarks.common import percentiles, report, seed_database, write_report
+
+
+def read_modify_write(db, book_id: int, available: bool):
+    book = book_services.get_book_by_id(db, book_id)
+    if book.is_available == available:
+        raise ConflictError("Book is not checked out" if available else "Book is already checked out")
+    return book_services.update_book(db, book_id, UpdateBookSchema(isAvailable=available))
+
+
+def atomic(db, book_id: int, available: bool):
+    return book_services.set_availability(db, book_id, available)
+
+
+STRATEGIES = {"atomic": atomic, "read_modify_write": read_modify_write}
+
+
+def run_strategy(name: str, args) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-checkout-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    configure_sqlite(engine, sqlite_pragmas(args.profile))
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    seed_database(SessionLocal, authors=10, books=args.hot_books)
+    change = STRATEGIES[name]
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    # Préstamos que cada hilo cree tener en curso por libro (más de 1 = préstamo doble)
+    holders = {book_id: 0 for book_id in range(1, args.hot_books + 1)}
+    results = {"latencies": [], "conflicts": 0, "lock_errors": 0, "double_checkouts": 0}
+
+    def worker():
+        latencies, conflicts, lock_errors, doubles = [], 0, 0, 0
+        while not stop.is_set():
+            book_id = random.randint(1, args.hot_books)
+            start = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    change(db, book_id, False)
+            except ConflictError:
+                conflicts += 1
+                continue
+            except OperationalError:
+                lock_errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+            with lock:
+                holders[book_id] += 1
+                doubles += holders[book_id] > 1
+            time.sleep(args.hold_ms / 1000)
+            with lock:
+                holders[book_id] -= 1
+
+            start = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    change(db, book_id, True)
+                latencies.append(time.perf_counter() - start)
+            except ConflictError:
+                conflicts += 1
+            except OperationalError:
+                lock_errors += 1
+
+        with lock:
+            results["latencies"].extend(latencies)
+            results["conflicts"] += conflicts
+            results["lock_errors"] += lock_errors
+            results["double_checkouts"] += doubles
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "strategy": name,
+        "operations_per_second": len(results["latencies"]) / args.seconds,
+        "conflicts": results["conflicts"],
+        "lock_errors": results["lock_errors"],
+        "double_checkouts": results["double_checkouts"],
+        "latency_ms": percentiles(results["latencies"]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=["atomic", "read_modify_write"])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--hot-books", type=int, default=8, help="Books all threads compete for")
+    parser.add_argument("--hold-ms", type=float, default=1.0, help="Time a borrowed book is held before returning it")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profile", default=None, help="SQLITE_PROFILE for the benchmark engine (default: env)")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = [run_strategy(name, args) for name in args.strategies]
+    write_report(report("checkout_contention", vars(args), results), args.output)
+
+
+if __name__ == "__main__":
+    main()
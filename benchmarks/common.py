@@ -0,0 +1,131 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from sqlalchemy import insert
+
+from models.author_model import Author
+from models.book_model import Book
+from models.user_model import User
+from core.security import get_password_hash
+# Registra el índice FTS5 en Base.metadata antes de cualquier create_all
+from services.books import search_index  # noqa: F401
+
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench-password"
+GENRES = ["Novela", "Ensayo", "Poesía", "Ciencia ficción", "Historia", "Fantasía", "Teatro", "Biografía"]
+NATIONALITIES = ["Colombiana", "Argentina", "Española", "Mexicana", "Chilena", "Peruana"]
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99 (and mean/max) of latencies given in seconds, reported in milliseconds."""
+    if not samples:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered) * 1000,
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1] * 1000,
+    }
+
+
+def measure(name: str, fn, iterations: int, warmup: int, before=None) -> dict:
+    """Runs `fn` `iterations` times (after `warmup` untimed calls); `before` runs untimed before each call."""
+    for _ in range(warmup):
+        if before:
+            before()
+        fn()
+
+    samples = []
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    total = sum(samples)
+    return {
+        "name": name,
+        "iterations": iterations,
+        "ops_per_second": iterations / total if total else None,
+        "latency_ms": percentiles(samples),
+    }
+
+
+def seed_database(SessionLocal, authors: int, books: int, users: int = 1) -> None:
+    """Fills an empty database with `authors` authors, `books` books and `users` users.
+
+    The first user is BENCH_USERNAME / BENCH_PASSWORD, the rest bench-1, bench-2...
+    with the same password (a single bcrypt hash is shared to keep seeding fast).
+    """
+    authors = max(1, authors)
+    with SessionLocal() as db:
+        db.execute(insert(Author), [
+            {"name": f"Autor {i:06d}", "nationality": NATIONALITIES[i % len(NATIONALITIES)]}
+            for i in range(authors)
+        ])
+        for start in range(0, books, 5000):
+            db.execute(insert(Book), [
+                {
+                    "title": f"Libro {i:07d}",
+                    "isbn": f"978-{i:09d}",
+                    "author_id": i % authors + 1,
+                    "genre": GENRES[i % len(GENRES)],
+                    "published_year": 1900 + i % 125,
+                    "is_available": i % 3 != 0,
+                }
+                for i in range(start, min(books, start + 5000))
+            ])
+        hashed = get_password_hash(BENCH_PASSWORD)
+        db.execute(insert(User), [
+            {"username": BENCH_USERNAME if i == 0 else f"{BENCH_USERNAME}-{i}", "password": hashed}
+            for i in range(users)
+        ])
+        db.commit()
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(benchmark: str, params: dict, results) -> dict:
+    """Envelope shared by every benchmark so runs from different commits can be diffed."""
+    return {
+        "benchmark": benchmark,
+        "commit": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+
+
+def write_report(data: dict, output: str | None = None) -> None:
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+            file.write("\n")
+    else:
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
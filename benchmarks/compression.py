@@ -0,0 +1,112 @@
+"""Response compression benchmark: CPU cost vs bytes saved.
+
+Builds real response bodies (a page of books, the normalized book view, a page
+of authors and an NDJSON export) from a seeded temporary SQLite file and
+compresses each one with every available encoding (gzip always, br/zstd when
+installed) and level. The export is compressed chunk by chunk with a flush per
+chunk, like the middleware does for streamed responses. Reports per case the
+time per body, throughput in MB/s, compressed size and ratio.
+
+    python -m benchmarks.compression --limit 100 --iterations 200
+    python -m benchmarks.compression --levels gzip=1,6,9 br=1,4 zstd=1,3
+"""
+import argparse
+import os
+import tempfile
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.db import Base
+from core import fast_json
+from core.compression import ENCODERS
+from core.streaming import iter_export
+from models.book_model import Book
+from schemas.author_schema import AuthorOut
+from schemas.book_schema import BookOut
+from services.authors import author_services
+from services.books import book_services
+from benchmarks.common import measure, report, seed_database, write_report
+
+DEFAULT_LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 9), "zstd": (1, 3, 9)}
+
+
+def parse_levels(values: list[str] | None) -> dict:
+    if not values:
+        return {name: levels for name, levels in DEFAULT_LEVELS.items() if name in ENCODERS}
+    levels = {}
+    for value in values:
+        name, _, numbers = value.partition("=")
+        if name not in ENCODERS:
+            raise SystemExit(f"Encoding not available here: {name} (installed: {', '.join(ENCODERS)})")
+        levels[name] = tuple(int(number) for number in numbers.split(","))
+    return levels
+
+
+def build_payloads(SessionLocal, args) -> dict:
+    with SessionLocal() as db:
+        query, _ = book_services.books_statement(db)
+        books = db.scalars(query.order_by(Book.id).limit(args.limit)).all()
+        authors = author_services.get_authors(db, page=1, limit=args.limit)
+        rows = list(islice(book_services.export_books(db), args.export_rows))
+
+    return {
+        "books": fast_json.json_response(book_services.books_out(books), list[BookOut]).body,
+        "books.normalized": fast_json.json_response(book_services.books_normalized_out(books), dict[str, Any]).body,
+        "authors": fast_json.json_response(author_services.authors_out(None)(authors), list[AuthorOut]).body,
+        "export.ndjson": list(iter_export(rows, "ndjson", book_services.BOOK_EXPORT_COLUMNS)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100, help="Rows per list page")
+    parser.add_argument("--export-rows", type=int, default=5000, help="Rows in the NDJSON export")
+    parser.add_argument("--levels", nargs="*", default=None, metavar="ENCODING=L1,L2",
+                        help="Levels per encoding (default: gzip=1,6,9 br=1,4,9 zstd=1,3,9)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    levels = parse_levels(args.levels)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-compression-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+    seed_database(SessionLocal, authors=max(1, args.limit // 2), books=max(args.limit, args.export_rows))
+    payloads = build_payloads(SessionLocal, args)
+    engine.dispose()
+
+    results = []
+    for payload_name, payload in payloads.items():
+        # Las exportaciones llegan al middleware en trozos de ~64KB (more_body)
+        chunks = payload if isinstance(payload, list) else [payload]
+        size = sum(len(chunk) for chunk in chunks)
+        for encoding, encoding_levels in levels.items():
+            for level in encoding_levels:
+                def compress():
+                    encoder = ENCODERS[encoding](level)
+                    return b"".join([encoder.chunk(chunk) for chunk in chunks[:-1]] + [encoder.finish(chunks[-1])])
+
+                result = measure(f"{payload_name}.{encoding}.{level}", compress, args.iterations, args.warmup)
+                compressed = len(compress())
+                result.update({
+                    "encoding": encoding,
+                    "level": level,
+                    "bytes_in": size,
+                    "bytes_out": compressed,
+                    "ratio": size / compressed,
+                    "saved_bytes": size - compressed,
+                    "mb_per_second": size / (result["latency_ms"]["p50"] / 1000) / 1e6,
+                    "chunks": len(chunks),
+                })
+                results.append(result)
+
+    write_report(report("compression", vars(args), {"encodings": list(ENCODERS), "cases": results}), args.output)
+
+
+if __name__ == "__main__":
+    main()
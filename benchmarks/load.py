@@ -0,0 +1,200 @@
+"""HTTP load harness.
+
+Seeds a temporary SQLite database with N authors and M books, starts the API
+with uvicorn on a local port and drives it with concurrent httpx clients for a
+fixed duration. Prints a JSON report with throughput and p50/p95/p99 per
+operation and overall.
+
+    python -m benchmarks.load --authors 1000 --books 50000 --workload mixed --concurrency 32
+    python -m benchmarks.load --db-mode async --server-env RESPONSE_CACHE_SIZE=0 --output async.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.db import Base
+from benchmarks.common import BENCH_PASSWORD, BENCH_USERNAME, GENRES, percentiles, report, seed_database, write_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Peso relativo de cada operación en cada carga de trabajo
+WORKLOADS = {
+    "read": {"list_books": 35, "get_book": 35, "search_books": 10, "list_authors": 10, "get_author": 10},
+    "mixed": {"list_books": 25, "get_book": 30, "search_books": 5, "list_authors": 10, "create_book": 15, "update_book": 15},
+    "write": {"create_book": 50, "update_book": 50},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, database_url: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url, DB_MODE=args.db_mode)
+    for item in args.server_env:
+        name, _, value = item.partition("=")
+        env[name] = value
+    command = [
+        sys.executable, "-m", "uvicorn", "app:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+    ]
+    # La salida del servidor va a stderr para que stdout sea solo el informe JSON
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=sys.stderr)
+
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/openapi.json", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready in time")
+
+
+def operations(args) -> dict:
+    """Each operation returns (method, path, json_body) for one request."""
+    books, authors = max(1, args.books), max(1, args.authors)
+    pages = max(1, books // 10)
+
+    return {
+        "list_books": lambda: ("GET", f"/api/books/?page={random.randint(1, min(pages, 100))}&limit=10", None),
+        "get_book": lambda: ("GET", f"/api/books/{random.randint(1, books)}", None),
+        "search_books": lambda: ("GET", f"/api/books/?search={random.choice(GENRES)}&limit=10", None),
+        "list_authors": lambda: ("GET", f"/api/authors/?page={random.randint(1, 10)}&limit=50", None),
+        "get_author": lambda: ("GET", f"/api/authors/{random.randint(1, authors)}", None),
+        "create_book": lambda: ("POST", "/api/books/", {
+            "title": "Libro de carga", "isbn": f"load-{uuid.uuid4().hex}",
+            "author_id": random.randint(1, authors), "genre": random.choice(GENRES),
+        }),
+        "update_book": lambda: ("PUT", f"/api/books/{random.randint(1, books)}", {"isAvailable": random.random() < 0.5}),
+    }
+
+
+async def run_load(args, base_url: str, token: str) -> dict:
+    ops = operations(args)
+    weights = WORKLOADS[args.workload]
+    names, shares = list(weights), list(weights.values())
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    statuses: dict[str, int] = {}
+    # Bytes recibidos por la red (comprimidos si el servidor comprimió)
+    wire_bytes = 0
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    if args.accept_encoding:
+        headers["Accept-Encoding"] = args.accept_encoding
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30.0) as client:
+
+        async def worker(deadline: float, record: bool):
+            nonlocal wire_bytes
+            while time.perf_counter() < deadline:
+                name = random.choices(names, weights=shares)[0]
+                method, path, body = ops[name]()
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status = str(response.status_code)
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                elapsed = time.perf_counter() - start
+                if not record:
+                    continue
+                statuses[status] = statuses.get(status, 0) + 1
+                if status.isdigit():
+                    wire_bytes += response.num_bytes_downloaded
+                if status.startswith("2"):
+                    latencies[name].append(elapsed)
+                else:
+                    errors[name] += 1
+
+        if args.warmup > 0:
+            deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(worker(deadline, False) for _ in range(args.concurrency)))
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(worker(deadline, True) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "duration_seconds": elapsed,
+        "requests": len(all_samples) + sum(errors.values()),
+        "throughput_rps": len(all_samples) / elapsed,
+        "errors": sum(errors.values()),
+        "status_codes": statuses,
+        "wire_bytes": wire_bytes,
+        "latency_ms": percentiles(all_samples),
+        "operations": {
+            name: {
+                "requests": len(latencies[name]) + errors[name],
+                "throughput_rps": len(latencies[name]) / elapsed,
+                "errors": errors[name],
+                "latency_ms": percentiles(latencies[name]),
+            }
+            for name in names
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--server-env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra environment for the server, e.g. SQLITE_PROFILE=off")
+    parser.add_argument("--accept-encoding", default=None,
+                        help='Accept-Encoding sent by the client, e.g. "identity" or "br" (default: httpx\'s "gzip, deflate")')
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-load-"), "bench.db")
+    database_url = f"sqlite:///{path}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    seed_database(sessionmaker(bind=engine), args.authors, args.books)
+    engine.dispose()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(args, database_url, port)
+    try:
+        wait_until_ready(base_url, server)
+        login = httpx.post(f"{base_url}/api/users/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+        login.raise_for_status()
+        results = asyncio.run(run_load(args, base_url, login.json()["access_token"]))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    write_report(report("load", vars(args), results), args.output)
+
+
+if __name__ == "__main__":
+    main()
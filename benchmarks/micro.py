@@ -0,0 +1,86 @@
+"""Service-level microbenchmarks.
+
+Times book_services.get_books, book_services.create_book and
+core.auth.get_current_user directly (no HTTP) against a seeded temporary SQLite
+file and prints a JSON report with ops/s and p50/p95/p99 per case.
+
+    python -m benchmarks.micro --authors 1000 --books 50000 --iterations 500
+    python -m benchmarks.micro --only get_books --output before.json
+"""
+import argparse
+import os
+import tempfile
+import uuid
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.db import Base
+from db.sqlite_tuning import sqlite_pragmas, configure_sqlite
+from core.auth import create_access_token, get_current_user, token_cache
+from schemas.book_schema import CreateBookSchema
+from services import cache as response_cache
+from services.books import book_services
+from benchmarks.common import BENCH_USERNAME, measure, report, seed_database, write_report
+
+
+def build_cases(db, args) -> dict:
+    pages = max(1, args.books // 10)
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": BENCH_USERNAME})
+    )
+    author_ids = max(1, args.authors)
+
+    def create_book():
+        book_services.create_book(db, CreateBookSchema(
+            title="Libro benchmark", isbn=f"bench-{uuid.uuid4().hex}", author_id=author_ids, genre="Novela"
+        ))
+
+    return {
+        "get_books.first_page": lambda: book_services.get_books(db, page=1, limit=10),
+        "get_books.deep_page": lambda: book_services.get_books(db, page=pages, limit=10),
+        "get_books.title_filter": lambda: book_services.get_books(db, title="Libro 0001"),
+        "get_books.search": lambda: book_services.get_books(db, search="novela"),
+        "get_books_keyset.first_page": lambda: book_services.get_books_keyset(db, limit=10),
+        "create_book": create_book,
+        "get_current_user.cold": lambda: get_current_user(credentials, db),
+        "get_current_user.cached": lambda: get_current_user(credentials, db),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--profile", default=None, help="SQLITE_PROFILE for the benchmark engine (default: env)")
+    parser.add_argument("--only", nargs="*", default=None, help="Case name prefixes to run")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-micro-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    configure_sqlite(engine, sqlite_pragmas(args.profile))
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed_database(SessionLocal, args.authors, args.books)
+
+    results = []
+    with SessionLocal() as db:
+        for name, fn in build_cases(db, args).items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            # Los casos "cold" miden el camino completo, sin la caché de tokens
+            before = token_cache.clear if name.endswith(".cold") else None
+            response_cache.clear()
+            results.append(measure(name, fn, args.iterations, args.warmup, before))
+            db.rollback()
+    engine.dispose()
+
+    write_report(report("micro", vars(args), results), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""JSON serialization benchmark for the list endpoints.
+
+Compares, for one page of books and one of authors, the default FastAPI path
+(response_model validation + serialize + JSONResponse) with the FAST_JSON path
+(core.fast_json: TypeAdapter.dump_json straight to bytes). Each path is timed
+from already-built schemas (what the response cache returns) and from ORM rows
+(cache miss), plus the normalized book view (view=normalized) and the
+response size of both book views.
+
+    python -m benchmarks.serialization --limit 100 --iterations 500
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.db import Base
+from core import fast_json
+from schemas.author_schema import AuthorOut
+from models.book_model import Book
+from schemas.book_schema import BookOut
+from services.authors import author_services
+from services.books import book_services
+from benchmarks.common import measure, report, seed_database, write_report
+
+
+def response_model_path(type_, loop):
+    """What FastAPI does with a route's return value when response_model is set."""
+    field = APIRoute("/", lambda: None, response_model=type_).response_field
+
+    def run(content):
+        serialized = loop.run_until_complete(serialize_response(field=field, response_content=content))
+        return JSONResponse(serialized).body
+    return run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100, help="Rows per page")
+    parser.add_argument("--authors", type=int, default=5, help="Distinct authors in the book page")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-json-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+    # Los libros se reparten entre los autores en rueda: se siembran suficientes
+    # para llenar una página solo con los primeros --authors autores
+    seed_database(SessionLocal, authors=args.limit, books=args.limit * max(1, args.limit // args.authors))
+
+    with SessionLocal() as db:
+        query, _ = book_services.books_statement(db)
+        book_rows = db.scalars(query.where(Book.author_id <= args.authors).order_by(Book.id).limit(args.limit)).all()
+        author_rows = author_services.get_authors(db, page=1, limit=args.limit)
+
+    loop = asyncio.new_event_loop()
+    book_schemas = book_services.books_out(book_rows)
+    author_schemas = author_services.authors_out(None)(author_rows)
+    normalized = book_services.books_normalized_out(book_rows)
+    books_default = response_model_path(list[BookOut], loop)
+    authors_default = response_model_path(list[AuthorOut], loop)
+
+    # Misma salida en ambos caminos antes de medir
+    assert books_default(book_schemas) == fast_json.json_response(book_schemas, list[BookOut]).body
+
+    cases = {
+        "books.cached.response_model": lambda: books_default(book_schemas),
+        "books.cached.fast_json": lambda: fast_json.json_response(book_schemas, list[BookOut]).body,
+        "books.orm.response_model": lambda: books_default(book_rows),
+        "books.orm.fast_json": lambda: fast_json.json_response(book_services.books_out(book_rows), list[BookOut]).body,
+        "books.cached.normalized.fast_json": lambda: fast_json.json_response(normalized, dict[str, Any]).body,
+        "books.orm.normalized.fast_json": lambda: fast_json.json_response(book_services.books_normalized_out(book_rows), dict[str, Any]).body,
+        "authors.cached.response_model": lambda: authors_default(author_schemas),
+        "authors.cached.fast_json": lambda: fast_json.json_response(author_schemas, list[AuthorOut]).body,
+    }
+    results = [measure(name, fn, args.iterations, args.warmup) for name, fn in cases.items()]
+    loop.close()
+    engine.dispose()
+
+    sizes = {
+        "books.embedded_bytes": len(fast_json.json_response(book_schemas, list[BookOut]).body),
+        "books.normalized_bytes": len(fast_json.json_response(normalized, dict[str, Any]).body),
+    }
+
+    # Cada caso fast_json se compara con el response_model del mismo origen (cached/orm)
+    by_name = {result["name"]: result for result in results}
+    for result in results:
+        if result["name"].endswith(".fast_json"):
+            resource, source = result["name"].split(".")[:2]
+            baseline = by_name[f"{resource}.{source}.response_model"]
+            result["speedup"] = baseline["latency_ms"]["p50"] / result["latency_ms"]["p50"]
+
+    write_report(report("serialization", vars(args), {"cases": results, "response_sizes": sizes}), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Read/write concurrency benchmark for the SQLite connection profiles.
+
+Runs the same mixed workload (reader threads calling book_services.get_book_by_id
+and get_books while writer threads call update_book) against a temporary database
+file once per profile in db/sqlite_tuning.py, and prints one JSON document.
+With --read-engine the readers use their own read-only engine (mode=ro, as
+db.db.get_read_db does) instead of sharing the writers' engine and pool.
+
+    python -m benchmarks.sqlite_concurrency --profiles off wal --seconds 5
+    python -m benchmarks.sqlite_concurrency --profiles wal --writers 4 --read-engine
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from db.db import Base, read_only_url
+from db.sqlite_tuning import sqlite_pragmas, configure_sqlite
+from schemas.book_schema import UpdateBookSchema
+from services.books import book_services
+from benchmarks.common import percentiles, report, seed_database, write_report
+
+
+def run_profile(profile: str, books: int, readers: int, writers: int, seconds: float, read_engine: bool = False) -> dict:
+    directory = tempfile.mkdtemp(prefix="bench-sqlite-")
+    path = os.path.join(directory, "bench.db")
+    # Sin busy_timeout de la librería: la espera la decide el perfil (PRAGMA busy_timeout)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 0})
+    pragmas = sqlite_pragmas(profile)
+    configure_sqlite(engine, pragmas)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed_database(SessionLocal, authors=100, books=books)
+    ReadSessionLocal, reader_engine = SessionLocal, engine
+    if read_engine:
+        reader_engine = create_engine(
+            read_only_url(f"sqlite:///{path}"), connect_args={"check_same_thread": False, "timeout": 0}
+        )
+        configure_sqlite(reader_engine, {name: value for name, value in pragmas.items() if name != "journal_mode"})
+        ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=reader_engine)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {"read": [], "write": [], "read_errors": 0, "write_errors": 0}
+
+    def reader():
+        latencies, errors = [], 0
+        with ReadSessionLocal() as db:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    if random.random() < 0.8:
+                        book_services.get_book_by_id(db, random.randint(1, books))
+                    else:
+                        book_services.get_books(db, page=random.randint(1, 50), limit=20)
+                    db.rollback()
+                    latencies.append(time.perf_counter() - start)
+                except OperationalError:
+                    db.rollback()
+                    errors += 1
+        with lock:
+            results["read"].extend(latencies)
+            results["read_errors"] += errors
+
+    def writer():
+        latencies, errors = [], 0
+        with SessionLocal() as db:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    book_id = random.randint(1, books)
+                    book_services.update_book(db, book_id, UpdateBookSchema(isAvailable=random.random() < 0.5))
+                    latencies.append(time.perf_counter() - start)
+                except OperationalError:
+                    db.rollback()
+                    errors += 1
+        with lock:
+            results["write"].extend(latencies)
+            results["write_errors"] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    reader_engine.dispose()
+
+    return {
+        "profile": profile,
+        "read_engine": read_engine,
+        "pragmas": pragmas,
+        "reads_per_second": len(results["read"]) / seconds,
+        "writes_per_second": len(results["write"]) / seconds,
+        "read_errors": results["read_errors"],
+        "write_errors": results["write_errors"],
+        "read_latency_ms": percentiles(results["read"]),
+        "write_latency_ms": percentiles(results["write"]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["off", "wal"])
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--read-engine", action="store_true", help="Readers on a separate read-only engine")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = [run_profile(profile, args.books, args.readers, args.writers, args.seconds, args.read_engine) for profile in args.profiles]
+    write_report(report("sqlite_concurrency", vars(args), results), args.output)
+
+
+if __name__ == "__main__":
+    main()
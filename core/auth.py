@@ -1,13 +1,22 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
+import threading
+import time
+import uuid
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 import os
 
-from db.db import get_db
+from core.cache import TTLCache
+from core.metrics import span
+from db.db import get_read_db, get_async_read_db
 from models.user_model import User
 
 load_dotenv()
@@ -15,6 +24,10 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 1024))
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", 300))
+# Modo sin estado: el token lleva uid y versión y get_current_user no consulta la base
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() in ("1", "true", "yes")
 
 security = HTTPBearer()
 
@@ -24,21 +37,139 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def token_claims(user: User) -> dict:
+    """Claims for a login token: `sub`, plus uid/ver/jti in stateless mode."""
+    claims = {"sub": user.username}
+    if AUTH_STATELESS:
+        # jti: dos logins seguidos dan tokens distintos, que se revocan por separado
+        claims.update({"uid": user.id, "ver": token_versions.get(user.id, 0), "jti": uuid.uuid4().hex})
+    return claims
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by the routes; safe to share across sessions."""
+    id: int
+    username: str
+
+
+# Caché de tokens ya validados: digest del token -> Principal. Cada entrada vive
+# como máximo AUTH_CACHE_TTL_SECONDS y nunca más allá del `exp` del token.
+token_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+
+class TokenDenylist:
+    """Digests of revoked tokens, each kept only until the token's own exp."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, float] = {}
+
+    def add(self, digest: str, exp: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._entries = {key: until for key, until in self._entries.items() if until > now}
+            self._entries[digest] = exp
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return self._entries.get(digest, 0) > time.time()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Revocación en memoria (por proceso): tokens cerrados con logout y versión de
+# token por usuario. Un token sin estado con `ver` menor que la actual se rechaza.
+token_denylist = TokenDenylist()
+token_versions: dict[int, int] = {}
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _decode_token(token: str) -> dict:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    if not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+def _remember(digest: str, payload: dict, user_id: int, username: str) -> Principal:
+    principal = Principal(id=user_id, username=username)
+    ttl = payload.get("exp", 0) - time.time()
+    token_cache.set(digest, principal, ttl=ttl)
+    return principal
+
+def _cached_principal(token: str) -> tuple[str, Optional[Principal]]:
+    digest = _token_digest(token)
+    if digest in token_denylist:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return digest, token_cache.get(digest)
+
+def _stateless_principal(digest: str, payload: dict) -> Optional[Principal]:
+    """Principal built from the claims alone; None for tokens without uid (looked up in the DB)."""
+    if not AUTH_STATELESS or "uid" not in payload:
+        return None
+    if payload.get("ver", 0) < token_versions.get(payload["uid"], 0):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return _remember(digest, payload, payload["uid"], payload["sub"])
+
+def invalidate_user(user_id: int) -> int:
+    token_versions[user_id] = token_versions.get(user_id, 0) + 1
+    return token_cache.delete_where(lambda digest, principal: principal.id == user_id)
+
+def revoke_token(token: str) -> None:
+    """Logout: the token stops being accepted until it would have expired anyway."""
+    payload = _decode_token(token)
+    digest = _token_digest(token)
+    token_denylist.add(digest, payload.get("exp", 0))
+    token_cache.delete(digest)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_tokens(mapper, connection, target):
+    invalidate_user(target.id)
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if not username:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    with span("auth"):
+        digest, principal = _cached_principal(credentials.credentials)
+        if principal is not None:
+            return principal
 
-        user = db.query(User).filter(User.username == username).first()
+        payload = _decode_token(credentials.credentials)
+        principal = _stateless_principal(digest, payload)
+        if principal is not None:
+            return principal
+        user = db.query(User).filter(User.username == payload["sub"]).first()
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
 
-        return user
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+        return _remember(digest, payload, user.id, user.username)
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    with span("auth"):
+        digest, principal = _cached_principal(credentials.credentials)
+        if principal is not None:
+            return principal
+
+        payload = _decode_token(credentials.credentials)
+        principal = _stateless_principal(digest, payload)
+        if principal is not None:
+            return principal
+        user = await db.scalar(select(User).where(User.username == payload["sub"]))
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+
+        return _remember(digest, payload, user.id, user.username)
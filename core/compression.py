@@ -0,0 +1,249 @@
+import os
+import threading
+import time
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# brotli y zstd son opcionales (extra "compression"); sin ellos solo se ofrece gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compresión de respuestas negociada con Accept-Encoding. Solo se comprimen los
+# tipos de COMPRESSION_TYPES y los cuerpos de al menos COMPRESSION_MIN_SIZE
+# bytes; las respuestas en streaming se comprimen trozo a trozo.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_TYPES = tuple(
+    media_type.strip().lower()
+    for media_type in os.getenv(
+        "COMPRESSION_TYPES", "application/json,application/x-ndjson,text/csv,text/plain"
+    ).split(",")
+    if media_type.strip()
+)
+# Orden de preferencia del servidor cuando el cliente acepta varias con el mismo q
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", 3))
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int | None = None):
+        # wbits=31: formato gzip (cabecera + CRC), no deflate crudo
+        self._compressor = zlib.compressobj(GZIP_LEVEL if level is None else level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Z_SYNC_FLUSH: cada trozo del stream se puede descomprimir sin esperar al final
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level: int | None = None):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY if level is None else level)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int | None = None):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL if level is None else level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def available_encodings(preference: str = COMPRESSION_ENCODINGS) -> tuple[str, ...]:
+    names = (name.strip().lower() for name in preference.split(","))
+    return tuple(name for name in names if name in ENCODERS)
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header: str | None, encodings: tuple[str, ...]) -> str | None:
+    """Encoding with the highest q the client accepts; ties go to the server's order."""
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in encodings:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionStats:
+    """Bytes before/after and CPU time per encoding, exposed in /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[str, dict] = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, seconds: float, streamed: bool) -> None:
+        with self._lock:
+            values = self._values.setdefault(
+                encoding, {"responses": 0, "streamed": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0}
+            )
+            values["responses"] += 1
+            values["streamed"] += int(streamed)
+            values["bytes_in"] += bytes_in
+            values["bytes_out"] += bytes_out
+            values["seconds"] += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {encoding: dict(values) for encoding, values in self._values.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+compression_stats = CompressionStats()
+
+
+class _Compression:
+    """Compression state of one response (an encoder plus its byte counters)."""
+
+    def __init__(self, encoding: str, streamed: bool):
+        self.encoding = encoding
+        self.encoder = ENCODERS[encoding]()
+        self.streamed = streamed
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def body(self, data: bytes, more_body: bool) -> bytes:
+        start = time.perf_counter()
+        compressed = self.encoder.chunk(data) if more_body else self.encoder.finish(data)
+        self.seconds += time.perf_counter() - start
+        self.bytes_in += len(data)
+        self.bytes_out += len(compressed)
+        if not more_body:
+            compression_stats.record(self.encoding, self.bytes_in, self.bytes_out, self.seconds, self.streamed)
+        return compressed
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware: gzip (plus br/zstd when installed) negotiated via Accept-Encoding.
+
+    The response start is held back until the first body message. A complete
+    body below `minimum_size` goes out untouched; a streamed body (more_body)
+    is compressed chunk by chunk without Content-Length. Strong ETags become
+    weak on compressed responses, as the bytes differ from the identity ones.
+    """
+
+    def __init__(self, app, minimum_size: int | None = None, content_types: tuple[str, ...] | None = None,
+                 encodings: str | None = None):
+        self.app = app
+        self.minimum_size = COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.content_types = COMPRESSION_TYPES if content_types is None else content_types
+        self.encodings = available_encodings(COMPRESSION_ENCODINGS if encodings is None else encodings)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        start_message = None
+        started = False
+        compression = None
+
+        async def send_compressed(message):
+            nonlocal start_message, started, compression
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or started:
+                if compression is not None and message["type"] == "http.response.body":
+                    more_body = message.get("more_body", False)
+                    message = {**message, "body": compression.body(message.get("body", b""), more_body)}
+                await send(message)
+                return
+
+            started = True
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            headers = MutableHeaders(raw=list(start_message["headers"]))
+            if not self._compressible(start_message["status"], headers):
+                await send(start_message)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None or (not more_body and len(body) < self.minimum_size):
+                await send({**start_message, "headers": headers.raw})
+                await send(message)
+                return
+
+            compression = _Compression(encoding, streamed=more_body)
+            compressed = compression.body(body, more_body)
+            headers["Content-Encoding"] = encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send({**start_message, "headers": headers.raw})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compressible(self, status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in self.content_types
@@ -0,0 +1,38 @@
+import hashlib
+import os
+from starlette.requests import Request
+from starlette.responses import Response
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# GET condicionales: las rutas calculan un ETag fuerte a partir de id + updated_at
+# (recursos) o de la versión de las tablas (listados) y, si coincide con
+# If-None-Match, responden 304 sin cuerpo antes de serializar nada.
+# Con HTTP_CACHE_MAX_AGE=0 (por defecto) el cliente revalida en cada petición.
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 0))
+CACHE_CONTROL = f"private, max-age={HTTP_CACHE_MAX_AGE}" if HTTP_CACHE_MAX_AGE > 0 else "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    candidates = (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+    return etag in candidates
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Response | None:
+    """304 response when If-None-Match matches; otherwise puts ETag and Cache-Control on `response`."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
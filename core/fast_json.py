@@ -0,0 +1,39 @@
+import os
+from functools import lru_cache
+from typing import Any
+from pydantic import TypeAdapter
+from starlette.responses import Response
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Ruta rápida opcional para los listados (FAST_JSON=true): la ruta devuelve los
+# esquemas ya construidos serializados directamente a bytes por pydantic-core,
+# sin que FastAPI vuelva a validarlos contra response_model ni pase por
+# jsonable_encoder + json.dumps. El JSON resultante es el mismo.
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=None)
+def adapter(type_) -> TypeAdapter:
+    """Compiled TypeAdapter per type, built once and reused across requests."""
+    return TypeAdapter(type_)
+
+
+class PydanticJSONResponse(Response):
+    media_type = "application/json"
+
+
+def json_response(value, type_=Any, headers=None) -> Response:
+    return PydanticJSONResponse(adapter(type_).dump_json(value), headers=headers)
+
+
+def render(value, type_=Any, response: Response | None = None):
+    """Bytes response when FAST_JSON is on; otherwise `value` for the usual response_model path.
+
+    `response` is the route's injected Response: its headers (ETag...) are copied
+    onto the bytes response, since FastAPI only applies them to returned values.
+    """
+    if not FAST_JSON:
+        return value
+    return json_response(value, type_, dict(response.headers) if response is not None else None)
@@ -0,0 +1,290 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Instrumentación por petición: latencia por ruta, número de queries y tiempo de
+# base de datos. Los datos de la petición en curso viven en un ContextVar, que
+# se propaga al threadpool de las rutas síncronas y a los greenlets de
+# AsyncSession, así que los hooks del engine saben a qué petición sumar.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Una misma sentencia ejecutada este número de veces en una petición se marca como N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    spans: dict = field(default_factory=dict)
+
+    def n_plus_one(self) -> list[tuple[str, int]]:
+        return [(sql, count) for sql, count in self.statements.items() if count >= N_PLUS_ONE_THRESHOLD]
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current() -> RequestStats | None:
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """Collects the SQL statements run inside the block (outside a request too, e.g. in tests)."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str):
+    """Adds the wall time of the block to the current request under `name` (Server-Timing entry)."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.spans[name] = stats.spans.get(name, 0.0) + time.perf_counter() - start
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram with one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [contador por bucket..., +Inf, suma]
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, series in items:
+            labels = _labels(zip(self.labels, label_values))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{_labels(zip(self.labels, label_values), le=_number(bound))} {count}')
+            lines.append(f'{self.name}_bucket{_labels(zip(self.labels, label_values), le="+Inf")} {series[-2]}')
+            lines.append(f"{self.name}_count{labels} {series[-2]}")
+            lines.append(f"{self.name}_sum{labels} {_number(series[-1])}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class CounterMetric:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_labels(zip(self.labels, label_values))} {_number(value)}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"), LATENCY_BUCKETS
+)
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+db_time = CounterMetric("http_request_db_seconds_total", "Time spent in SQL statements by route.", ("method", "route"))
+n_plus_one = CounterMetric(
+    "http_request_n_plus_one_total", "Requests that repeated one SQL statement N_PLUS_ONE_THRESHOLD+ times.", ("method", "route")
+)
+
+HTTP_METRICS = (request_duration, request_queries, db_time, n_plus_one)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs, **extra) -> str:
+    items = list(pairs) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in items) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def stats_lines(prefix: str, stats: dict, **labels) -> list[str]:
+    """Renders the numeric values of a `stats()` dict as gauges named `<prefix>_<key>`."""
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, (int, float)):
+            lines.append(f"{prefix}_{key}{_labels(labels.items())} {_number(value)}")
+    return lines
+
+
+def render(*extra: list[str]) -> str:
+    lines = []
+    for metric in HTTP_METRICS:
+        lines.extend(metric.render())
+    for block in extra:
+        lines.extend(block)
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    for metric in HTTP_METRICS:
+        metric.reset()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    stats.queries += 1
+    stats.db_time += time.perf_counter() - starts.pop()
+    stats.statements[statement] += 1
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute no se llama si la sentencia falla (p. ej. IntegrityError):
+    # se saca aquí su inicio para no dejarlo en conn.info, que vive con la conexión del pool
+    conn = exception_context.connection
+    starts = conn.info.get("query_start") if conn is not None else None
+    if not starts:
+        return
+    start = starts.pop()
+    stats = _current.get()
+    if stats is not None and exception_context.statement is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+        stats.statements[exception_context.statement] += 1
+
+
+def instrument_engine(engine) -> None:
+    """Counts and times every SQL statement of a (sync) engine for the current request."""
+    if not METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    entries = [f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"']
+    for name, duration in stats.spans.items():
+        entries.append(f"{name};dur={duration * 1000:.2f}")
+    entries.append(f"total;dur={total * 1000:.2f}")
+    repeated = stats.n_plus_one()
+    if repeated:
+        entries.append(f'n-plus-one;desc="{max(count for _, count in repeated)} repeated queries"')
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: Server-Timing header plus per-route histograms.
+
+    The header is written with the response start, so for streamed responses it
+    only covers the work done before the first byte; the histograms cover the
+    whole request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - start).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with collect() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self._record(scope, stats, status, time.perf_counter() - start)
+
+    def _record(self, scope, stats: RequestStats, status: int, elapsed: float) -> None:
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        method = scope["method"]
+        request_duration.observe((method, route, str(status)), elapsed)
+        request_queries.observe((method, route), stats.queries)
+        db_time.inc((method, route), stats.db_time)
+
+        repeated = stats.n_plus_one()
+        if repeated:
+            n_plus_one.inc((method, route))
+            sql, count = max(repeated, key=lambda item: item[1])
+            logger.warning("Possible N+1 in %s %s: statement ran %d times: %s", method, route, count, sql[:200])
@@ -1,4 +1,17 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# bcrypt cuesta ~100-300 ms de CPU por llamada: se ejecuta en un pool dedicado
+# ("thread" o "process") con un límite de peticiones pendientes.
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "thread").lower()
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", min(4, os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", HASH_POOL_SIZE * 4))
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
@@ -10,7 +23,96 @@ def get_password_hash(password: str) -> str:
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
         password_bytes = password_bytes[:72]
-    
+
     salt = bcrypt.gensalt()
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when the hashing pool already has HASH_MAX_PENDING calls queued."""
+    pass
+
+
+class HashingPool:
+    """Bounded executor for bcrypt calls with admission control."""
+
+    def __init__(self, kind: str, workers: int, max_pending: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingPoolSaturated("Password hashing pool is saturated")
+            self.pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run(self, fn, *args):
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._release()
+
+    def call(self, fn, *args):
+        """Sync counterpart of run() for routes served on the threadpool."""
+        self._admit()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": min(self.pending, self.workers),
+                "queue_depth": max(0, self.pending - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hashing_pool = HashingPool(HASH_EXECUTOR, HASH_POOL_SIZE, HASH_MAX_PENDING)
+
+def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    return hashing_pool.call(verify_password, plain_password, hashed_password)
+
+def get_password_hash_pooled(password: str) -> str:
+    return hashing_pool.call(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_pool.run(get_password_hash, password)
@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/jsonlines")
+
+
+def is_ndjson(request: Request) -> bool:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type in NDJSON_MEDIA_TYPES
+
+
+async def ndjson_chunks(request: Request, chunk_size: int) -> AsyncIterator[list[bytes]]:
+    """Reads an NDJSON body as it arrives and yields it in chunks of raw lines."""
+    buffer = b""
+    chunk = []
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                chunk.append(line)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+
+    if buffer.strip():
+        chunk.append(buffer)
+    if chunk:
+        yield chunk
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+_FLUSH_BYTES = 64 * 1024
+
+
+def _ndjson_line(row: dict, columns) -> str:
+    return json.dumps(row, default=_json_default, ensure_ascii=False) + "\n"
+
+
+def _csv_line(row: dict, columns) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(_csv_value(row[column]) for column in columns)
+    return buffer.getvalue()
+
+
+def _header(format: str, columns) -> str:
+    return _csv_line(dict(zip(columns, columns)), columns) if format == "csv" else ""
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def iter_export(rows: Iterable[dict], format: str, columns) -> Iterator[bytes]:
+    """Encodes rows as NDJSON or CSV and groups them into ~64KB chunks."""
+    encode = _csv_line if format == "csv" else _ndjson_line
+    parts = [_header(format, columns)]
+    size = len(parts[0])
+    for row in rows:
+        line = encode(row, columns)
+        parts.append(line)
+        size += len(line)
+        if size >= _FLUSH_BYTES:
+            yield "".join(parts).encode("utf-8")
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+async def aiter_export(rows: AsyncIterable[dict], format: str, columns) -> AsyncIterator[bytes]:
+    encode = _csv_line if format == "csv" else _ndjson_line
+    parts = [_header(format, columns)]
+    size = len(parts[0])
+    async for row in rows:
+        line = encode(row, columns)
+        parts.append(line)
+        size += len(line)
+        if size >= _FLUSH_BYTES:
+            yield "".join(parts).encode("utf-8")
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+def export_response(chunks, format: str, filename: str) -> StreamingResponse:
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
@@ -1,16 +1,95 @@
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine
-import os 
+from sqlalchemy import create_engine, make_url
+import os
+from datetime import datetime, timezone
 from dotenv import load_dotenv
+from db.sqlite_tuning import sqlite_pragmas, configure_sqlite
+from db.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool, register_pool
+from core.metrics import instrument_engine
 
 load_dotenv()
 
 base_url = os.getenv("DATABASE_URL")
 
-engine = create_engine(base_url, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# "sync" (Session sobre el threadpool) o "async" (AsyncSession + aiosqlite)
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+async_url = os.getenv("ASYNC_DATABASE_URL") or base_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+# PRAGMAs de SQLite aplicados a cada conexión (SQLITE_PROFILE=wal|off, ver db/sqlite_tuning.py)
+SQLITE_PRAGMAS = sqlite_pragmas()
+
+
+def read_only_url(url: str) -> str | None:
+    """Same SQLite file opened read-only (URI mode=ro); None for in-memory databases."""
+    url = make_url(url)
+    if not url.drivername.startswith("sqlite") or url.database in (None, "", ":memory:"):
+        return None
+    database = url.database if url.database.startswith("file:") else f"file:{url.database}"
+    return url.set(database=database, query={**url.query, "mode": "ro", "uri": "true"}).render_as_string(hide_password=False)
+
+
+def pool_options(url: str, prefix: str, size: int, overflow: int, poolclass=InstrumentedQueuePool) -> dict:
+    """Pool settings from {prefix}_POOL_SIZE, _MAX_OVERFLOW, _POOL_TIMEOUT, _POOL_RECYCLE and _POOL_PRE_PING."""
+    url = make_url(url)
+    # SQLite en memoria usa SingletonThreadPool/StaticPool, que no admiten overflow
+    if url.drivername.startswith("sqlite") and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": int(os.getenv(f"{prefix}_POOL_SIZE", size)),
+        "max_overflow": int(os.getenv(f"{prefix}_MAX_OVERFLOW", overflow)),
+        # Segundos esperando una conexión libre antes de fallar con TimeoutError
+        "pool_timeout": float(os.getenv(f"{prefix}_POOL_TIMEOUT", 30)),
+        # -1: sin reciclar; útil con servidores que cierran conexiones inactivas
+        "pool_recycle": int(os.getenv(f"{prefix}_POOL_RECYCLE", -1)),
+        "pool_pre_ping": os.getenv(f"{prefix}_POOL_PRE_PING", "false").lower() in ("1", "true", "yes"),
+    }
+
+
+# Lecturas y escrituras van por motores (y pools) distintos: las rutas GET usan
+# get_read_db, una conexión de solo lectura al mismo fichero (o READ_DATABASE_URL,
+# p. ej. una réplica). DB_READ_ROUTING=false vuelve a un único motor.
+DB_READ_ROUTING = os.getenv("DB_READ_ROUTING", "true").lower() in ("1", "true", "yes")
+read_url = (os.getenv("READ_DATABASE_URL") or read_only_url(base_url)) if DB_READ_ROUTING else None
+# journal_mode es persistente y lo fija el escritor; query_only protege también réplicas que no abren en mode=ro
+READ_PRAGMAS = {name: value for name, value in SQLITE_PRAGMAS.items() if name != "journal_mode"} | {"query_only": "ON"}
+
+engine = create_engine(
+    base_url, connect_args={"check_same_thread": False}, **pool_options(base_url, "DB", 5, 10)
+)
+configure_sqlite(engine, SQLITE_PRAGMAS)
+instrument_engine(engine)
+register_pool("write", engine)
+# Sin expirar al hacer commit: los objetos devueltos por las escrituras (RETURNING)
+# se serializan tal cual, sin un SELECT de refresco por atributo
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+if read_url:
+    read_engine = create_engine(
+        read_url, connect_args={"check_same_thread": False}, **pool_options(read_url, "READ_DB", 10, 20)
+    )
+    configure_sqlite(read_engine, READ_PRAGMAS)
+    instrument_engine(read_engine)
+    register_pool("read", read_engine)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
 Base = declarative_base()
 
+
+def utcnow():
+    # Default de columnas: se evalúa en cada INSERT/UPDATE, no una vez al importar el modelo
+    return datetime.now(timezone.utc)
+
+# El motor async se crea bajo demanda para no exigir aiosqlite en modo sync
+async_engine = None
+AsyncSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+
+# La sesión no toma una conexión del pool hasta su primera consulta: las rutas que
+# no llegan a consultar (p. ej. /users/profile con el token en caché) no ocupan ninguna
 def get_db():
     db = SessionLocal()
     try:
@@ -19,5 +98,59 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _create_async_sessionmaker(url: str, name: str, prefix: str, size: int, overflow: int, pragmas: dict):
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(url, **pool_options(url, prefix, size, overflow, InstrumentedAsyncQueuePool))
+    configure_sqlite(async_engine.sync_engine, pragmas)
+    instrument_engine(async_engine.sync_engine)
+    register_pool(name, async_engine.sync_engine)
+    # Sin expirar al hacer commit: en async no hay carga perezosa de atributos
+    return async_engine, async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def get_async_sessionmaker():
+    global async_engine, AsyncSessionLocal
+    if AsyncSessionLocal is None:
+        async_engine, AsyncSessionLocal = _create_async_sessionmaker(async_url, "async_write", "DB", 5, 10, SQLITE_PRAGMAS)
+    return AsyncSessionLocal
+
+
+def get_async_read_sessionmaker():
+    global async_read_engine, AsyncReadSessionLocal
+    if AsyncReadSessionLocal is None:
+        url = os.getenv("ASYNC_READ_DATABASE_URL") or (read_url and read_url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+        if not url:
+            return get_async_sessionmaker()
+        async_read_engine, AsyncReadSessionLocal = _create_async_sessionmaker(url, "async_read", "READ_DB", 10, 20, READ_PRAGMAS)
+    return AsyncReadSessionLocal
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with get_async_read_sessionmaker()() as db:
+        yield db
+
+
+def ensure_indexes(bind):
+    # create_all no añade índices nuevos a tablas que ya existen
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
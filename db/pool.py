@@ -0,0 +1,97 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """Checkout counters of one connection pool, exposed in /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record_checkout(self, wait: float, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            self.overflow_events += int(overflow)
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+            }
+
+
+class _InstrumentedPool:
+    """Times each checkout (waiting for a free connection or opening one) and counts overflow connections."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_stats = PoolStats()
+
+    def recreate(self):
+        # engine.dispose() sustituye el pool por uno nuevo: se conservan los contadores
+        pool = super().recreate()
+        pool.pool_stats = self.pool_stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        overflow = self._overflow
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.pool_stats.record_timeout(time.perf_counter() - start)
+            raise
+        # _overflow cuenta las conexiones abiertas menos pool_size: > 0 es una conexión de overflow
+        self.pool_stats.record_checkout(time.perf_counter() - start, self._overflow > max(overflow, 0))
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            **self.pool_stats.stats(),
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+# Motores cuyo pool se publica en /metrics, por nombre ("write", "read", ...)
+_engines: dict = {}
+
+
+def register_pool(name: str, engine) -> None:
+    _engines[name] = engine
+
+
+def pool_stats() -> dict[str, dict]:
+    return {
+        name: engine.pool.stats()
+        for name, engine in _engines.items()
+        if isinstance(engine.pool, _InstrumentedPool)
+    }
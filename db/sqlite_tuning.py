@@ -0,0 +1,80 @@
+import os
+from sqlalchemy import event
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Perfiles de PRAGMAs que se aplican a cada conexión nueva de SQLite.
+#  - "off": valores por defecto de SQLite (journal en modo rollback).
+#  - "wal": los lectores no se bloquean detrás de los escritores; synchronous=NORMAL
+#    es seguro en WAL (solo se puede perder la última transacción ante un corte de luz).
+SQLITE_PROFILES = {
+    "off": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+        "cache_size": -20000,
+        "mmap_size": 268435456,
+    },
+}
+
+_ALLOWED_VALUES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+_INTEGER_PRAGMAS = {"busy_timeout", "cache_size", "mmap_size"}
+
+# Cada PRAGMA se puede sobrescribir individualmente, p. ej. SQLITE_MMAP_SIZE=0
+_ENV_OVERRIDES = {
+    "journal_mode": "SQLITE_JOURNAL_MODE",
+    "synchronous": "SQLITE_SYNCHRONOUS",
+    "busy_timeout": "SQLITE_BUSY_TIMEOUT",
+    "temp_store": "SQLITE_TEMP_STORE",
+    "cache_size": "SQLITE_CACHE_SIZE",
+    "mmap_size": "SQLITE_MMAP_SIZE",
+}
+
+
+def sqlite_pragmas(profile: str | None = None) -> dict:
+    """Resolves the PRAGMAs for a profile (SQLITE_PROFILE by default) plus env overrides."""
+    profile = (profile or os.getenv("SQLITE_PROFILE", "wal")).lower()
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE '{profile}', expected one of {sorted(SQLITE_PROFILES)}")
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name, variable in _ENV_OVERRIDES.items():
+        value = os.getenv(variable)
+        if value not in (None, ""):
+            pragmas[name] = value
+    return {name: _validate(name, value) for name, value in pragmas.items()}
+
+
+def _validate(name: str, value):
+    if name in _INTEGER_PRAGMAS:
+        return int(value)
+    value = str(value).upper()
+    if value not in _ALLOWED_VALUES[name]:
+        raise ValueError(f"Invalid value '{value}' for PRAGMA {name}")
+    return value
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def configure_sqlite(engine, pragmas: dict) -> None:
+    """Applies `pragmas` to every new DBAPI connection of a (sync) SQLite engine."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
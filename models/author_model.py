@@ -1,18 +1,17 @@
 
-from datetime import datetime, timezone
 from sqlalchemy import Column, DateTime,Integer, String
 from sqlalchemy.orm import  relationship
-from db.db import Base
+from db.db import Base, utcnow
 
 class Author(Base):
     __tablename__ = "authors"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     nationality = Column(String, index=True, nullable=True)
     date_of_birth = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at =Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
 
     books = relationship("Book", back_populates="author")
 
@@ -1,23 +1,30 @@
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, DateTime
 from sqlalchemy.orm import  relationship
-from datetime import datetime, timezone
-from db.db import Base
+from db.db import Base, utcnow
 
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        # Listados con isAvailable=true ordenados por id (offset y cursor)
+        Index("ix_books_is_available_id", "is_available", "id"),
+        # Filtros por género y rango de años
+        Index("ix_books_genre_published_year", "genre", "published_year"),
+        Index("ix_books_published_year", "published_year"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     isbn = Column(String, index=True, nullable=False, unique=True)
     published_year = Column(Integer, nullable=True)
-    genre = Column(String, index=True, nullable=True)
+    genre = Column(String, nullable=True)
     is_available = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at =Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
 
 
-    author_id = Column(Integer, ForeignKey("authors.id"), nullable=False)
+    # Índice para los libros de un autor (JOIN, borrado de autores con libros)
+    author_id = Column(Integer, ForeignKey("authors.id"), nullable=False, index=True)
     author = relationship("Author", back_populates="books")
 
     def __repr__(self):
@@ -1,6 +1,5 @@
-from datetime import datetime, timezone
 from sqlalchemy import Column, String,DateTime, Integer
-from db.db import Base
+from db.db import Base, utcnow
 
 class User(Base):
     __tablename__ = "users"
@@ -8,8 +7,8 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
 
     def __repr__(self):
         return f"<User(username={self.username})>"
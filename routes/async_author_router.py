@@ -0,0 +1,142 @@
+from typing import Any, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.db import get_async_db, get_async_read_db
+from services.authors import async_author_services, author_services
+from services.exceptions import NotFoundError, BadRequestError
+from services.batch import parse_ids
+from schemas.author_schema import AuthorOut, AuthorBatch, AuthorPage, CreateAuthorSchema, UpdateAuthorSchema
+from core.auth import get_current_user_async
+from core import fast_json
+from core.conditional import conditional_response, make_etag
+from core.streaming import aiter_export, export_response
+
+router = APIRouter(prefix="/authors", tags=["Authors"])
+
+@router.get("/", response_model=list[AuthorOut] | AuthorPage)
+async def get_authors(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    page: int = 1,
+    limit: int = Query(100, ge=1, le=1000),
+    nationality: Optional[str] = None,
+    namePrefix: str = "",
+    fields: Optional[str] = None,
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
+    current_user=Depends(get_current_user_async),
+):
+    version = await async_author_services.authors_version(db)
+    not_modified = conditional_response(request, response, make_etag("authors", version, request.url.query))
+    if not_modified:
+        return not_modified
+
+    try:
+        projection = author_services.parse_fields(fields)
+        if pagination == "cursor" or cursor:
+            result = await async_author_services.get_authors_keyset_cached(db, limit, nationality, namePrefix, cursor, projection, version)
+        else:
+            result = await async_author_services.get_authors_cached(db, page, limit, nationality, namePrefix, projection, version)
+    except BadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Con proyección se devuelven solo las columnas pedidas, sin pasar por AuthorOut
+    if projection:
+        if fast_json.FAST_JSON:
+            return fast_json.json_response(result, headers=dict(response.headers))
+        return JSONResponse(content=jsonable_encoder(result), headers=dict(response.headers))
+    return fast_json.render(result, list[AuthorOut] if isinstance(result, list) else dict[str, Any], response)
+
+
+@router.get("/export")
+async def export_authors(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    rows = async_author_services.export_authors(db)
+    chunks = aiter_export(rows, format, author_services.AUTHOR_EXPORT_COLUMNS)
+    return export_response(chunks, format, "authors")
+
+
+@router.get("/batch", response_model=AuthorBatch)
+async def get_authors_batch(
+    ids: str = Query(..., description="Comma-separated ids, e.g. 3,1,2"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    # Un solo IN (...) para todos los ids; la respuesta sigue el orden pedido
+    try:
+        return await async_author_services.get_authors_batch_cached(db, parse_ids(ids))
+    except BadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{id}", response_model=AuthorOut)
+async def get_author_by_id(
+    id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    author = await async_author_services.get_author_cached(db, id)
+    if not author:
+        raise HTTPException(status_code=404, detail="Author not found")
+    not_modified = conditional_response(request, response, author_services.author_etag(author))
+    if not_modified:
+        return not_modified
+    return author
+
+
+@router.post("/", response_model=AuthorOut, status_code=201)
+async def create_author(
+    data: CreateAuthorSchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    try:
+        return await async_author_services.create_author(db, data)
+    except BadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.put("/{id}", response_model=AuthorOut)
+async def update_author(
+    id: int,
+    author_data: UpdateAuthorSchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    if not author_data:
+        raise HTTPException(status_code=400, detail="No data provided for update")
+    try:
+        return await async_author_services.update_author(db, id, author_data)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.delete("/{id}", status_code=200)
+async def delete_author(
+    id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    try:
+        await async_author_services.delete_author(db, id)
+        return {"message": "Author deleted successfully"}
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
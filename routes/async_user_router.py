@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.db import get_async_db
+from schemas.user_schema import UserCreate, UserLogin, Token
+from services.user.async_user_services import register_user, login_user
+from core.security import hashing_pool
+from core.auth import get_current_user_async, token_cache, security, revoke_token
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+@router.post("/register", response_model=UserCreate)
+async def register(data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    return await register_user(db, data)
+
+@router.post("/login", response_model=Token)
+async def login(data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    return await login_user(db, data.username, data.password)
+
+@router.get("/profile")
+async def get_profile(current_user = Depends(get_current_user_async)):
+    return {"message": f"Welcome {current_user.username}"}
+
+@router.post("/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user = Depends(get_current_user_async)
+):
+    revoke_token(credentials.credentials)
+    return {"message": "Logged out"}
+
+@router.get("/auth-cache/stats")
+async def get_auth_cache_stats(current_user = Depends(get_current_user_async)):
+    return token_cache.stats()
+
+@router.get("/hashing-pool/stats")
+async def get_hashing_pool_stats(current_user = Depends(get_current_user_async)):
+    return hashing_pool.stats()
@@ -1,31 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from db.db import get_db
+from db.db import get_db, get_read_db
 from services.authors import author_services
 from services.exceptions import NotFoundError, BadRequestError
-from schemas.author_schema import AuthorOut, CreateAuthorSchema, UpdateAuthorSchema
+from services.batch import parse_ids
+from schemas.author_schema import AuthorOut, AuthorBatch, AuthorPage, CreateAuthorSchema, UpdateAuthorSchema
 from core.auth import get_current_user
+from core import fast_json
+from core.conditional import conditional_response, make_etag
+from core.streaming import iter_export, export_response
 
 router = APIRouter(prefix="/authors", tags=["Authors"])
 
-@router.get("/", response_model=list[AuthorOut])
+@router.get("/", response_model=list[AuthorOut] | AuthorPage)
 def get_authors(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    page: int = 1,
+    limit: int = Query(100, ge=1, le=1000),
+    nationality: Optional[str] = None,
+    namePrefix: str = "",
+    fields: Optional[str] = None,
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
+    current_user=Depends(get_current_user),
+):
+    version = author_services.authors_version(db)
+    not_modified = conditional_response(request, response, make_etag("authors", version, request.url.query))
+    if not_modified:
+        return not_modified
+
+    try:
+        projection = author_services.parse_fields(fields)
+        if pagination == "cursor" or cursor:
+            authors = author_services.get_authors_keyset_cached(db, limit, nationality, namePrefix, cursor, projection, version)
+        else:
+            authors = author_services.get_authors_cached(db, page, limit, nationality, namePrefix, projection, version)
+    except BadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Con proyección se devuelven solo las columnas pedidas, sin pasar por AuthorOut
+    if projection:
+        if fast_json.FAST_JSON:
+            return fast_json.json_response(authors, headers=dict(response.headers))
+        return JSONResponse(content=jsonable_encoder(authors), headers=dict(response.headers))
+    return fast_json.render(authors, list[AuthorOut] if isinstance(authors, list) else dict[str, Any], response)
+
+
+@router.get("/export")
+def export_authors(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
 ):
-    authors = author_services.get_authors(db)
-    return authors
+    rows = author_services.export_authors(db)
+    chunks = iter_export(rows, format, author_services.AUTHOR_EXPORT_COLUMNS)
+    return export_response(chunks, format, "authors")
+
+
+@router.get("/batch", response_model=AuthorBatch)
+def get_authors_batch(
+    ids: str = Query(..., description="Comma-separated ids, e.g. 3,1,2"),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+):
+    # Un solo IN (...) para todos los ids; la respuesta sigue el orden pedido
+    try:
+        return author_services.get_authors_batch_cached(db, parse_ids(ids))
+    except BadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{id}", response_model=AuthorOut)
 def get_author_by_id(
     id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
 ):
-    author = author_services.get_author_by_id(db, id)
+    author = author_services.get_author_cached(db, id)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
+    not_modified = conditional_response(request, response, author_services.author_etag(author))
+    if not_modified:
+        return not_modified
     return author
 
 
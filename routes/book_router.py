@@ -1,34 +1,146 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from db.db import get_db
+from db.db import get_db, get_read_db
 from services.books import book_services
-from services.exceptions import NotFoundError, BadRequestError
-from schemas.book_schema import CreateBookSchema, UpdateBookSchema, BookOut
+from services.exceptions import NotFoundError, BadRequestError, ConflictError
+from services.batch import parse_ids
+from schemas.book_schema import CreateBookSchema, UpdateBookSchema, BookOut, BookPage, BookListNormalized, BookStats, BookBatch, BookAvailabilityOut, BulkImportResult
 from core.auth import get_current_user
+from core import fast_json
+from core.conditional import conditional_response, make_etag
+from core.streaming import is_ndjson, ndjson_chunks, iter_export, export_response
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
-@router.get("/", response_model=list[BookOut])
+@router.get("/", response_model=list[BookOut] | BookPage | BookListNormalized)
 def get_books(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     page: int = 1,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=1000),
     isAvailable: bool = False,
     title: str = "",
+    search: str = "",
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
+    view: Literal["embedded", "normalized"] = "embedded",
+    genre: Optional[str] = None,
+    authorId: Optional[int] = None,
+    yearFrom: Optional[int] = None,
+    yearTo: Optional[int] = None,
+    isbnPrefix: str = "",
+    sort: Optional[Literal[book_services.BOOK_SORT_OPTIONS]] = None,
+    count: bool = False,
+    current_user=Depends(get_current_user),
+):
+    # El ETag del listado depende de la versión de las tablas y de la query string
+    version = book_services.books_version(db)
+    not_modified = conditional_response(request, response, make_etag("books", version, request.url.query))
+    if not_modified:
+        return not_modified
+
+    # view=normalized: libros con author_id y cada autor una sola vez en "authors"
+    normalized = view == "normalized"
+    # Filtros y orden sobre columnas indexadas; con cursor el orden viaja en el propio cursor
+    filters = book_services.BookFilters(genre, authorId, yearFrom, yearTo, isbnPrefix, sort)
+    if count:
+        # Total de la consulta sin paginar, cacheado por versión de las tablas
+        total = book_services.count_books_cached(db, isAvailable, title, search, version, filters)
+        response.headers["X-Total-Count"] = str(total)
+    if pagination == "cursor" or cursor:
+        try:
+            result = book_services.get_books_keyset_cached(db, limit, isAvailable, title, cursor, search, normalized, version, filters)
+        except BadRequestError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return fast_json.render(result, dict[str, Any], response)
+    result = book_services.get_books_cached(db, page, limit, isAvailable, title, search, normalized, version, filters)
+    return fast_json.render(result, dict[str, Any] if normalized else list[BookOut], response)
+
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_create_books(
+    request: Request,
+    chunk_size: int = Query(book_services.BULK_CHUNK_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    # NDJSON se procesa por lotes a medida que llega; un array JSON se lee completo
+    if is_ndjson(request):
+        result = {"created": 0, "failed": 0, "errors": []}
+        seen_isbns = set()
+        start = 0
+        async for chunk in ndjson_chunks(request, chunk_size):
+            chunk_result = await run_in_threadpool(book_services.import_books_chunk, db, chunk, start, seen_isbns)
+            book_services.merge_import_results(result, chunk_result)
+            start += len(chunk)
+        return result
+
+    try:
+        rows = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    return await run_in_threadpool(book_services.bulk_create_books, db, rows, chunk_size)
+
+
+@router.get("/export")
+def export_books(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+):
+    rows = book_services.export_books(db)
+    chunks = iter_export(rows, format, book_services.BOOK_EXPORT_COLUMNS)
+    return export_response(chunks, format, "books")
+
+
+@router.get("/stats", response_model=BookStats)
+def get_book_stats(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+):
+    # Agregados por disponibilidad, género, década y autor: se recalculan solo
+    # cuando cambia la versión de las tablas, nunca un COUNT(*) por petición
+    version = book_services.books_version(db)
+    not_modified = conditional_response(request, response, make_etag("books-stats", version))
+    if not_modified:
+        return not_modified
+    return book_services.get_book_stats_cached(db, version)
+
+
+@router.get("/batch", response_model=BookBatch)
+def get_books_batch(
+    ids: str = Query(..., description="Comma-separated ids, e.g. 3,1,2"),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
 ):
-    return book_services.get_books(db, page, limit, isAvailable, title)
+    # Un solo IN (...) para todos los ids; la respuesta sigue el orden pedido
+    try:
+        return book_services.get_books_batch_cached(db, parse_ids(ids))
+    except BadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{id}", response_model=BookOut)
 def get_book_by_id(
     id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
 ):
-		book = book_services.get_book_by_id(db, id)
+		book = book_services.get_book_cached(db, id)
 		if not book:
 				raise HTTPException(status_code=404, detail="Book not found")
+		not_modified = conditional_response(request, response, book_services.book_etag(book))
+		if not_modified:
+				return not_modified
 		return book
 
 
@@ -66,6 +178,34 @@ def update_book(
 	except Exception:
 		raise HTTPException(status_code=500, detail="Internal server error")
 		
+@router.post("/{id}/checkout", response_model=BookAvailabilityOut)
+def checkout_book(
+    id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+	try:
+		return book_services.checkout_book(db, id)
+	except NotFoundError as e:
+		raise HTTPException(status_code=404, detail=str(e))
+	except ConflictError as e:
+		raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/{id}/return", response_model=BookAvailabilityOut)
+def return_book(
+    id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+	try:
+		return book_services.return_book(db, id)
+	except NotFoundError as e:
+		raise HTTPException(status_code=404, detail=str(e))
+	except ConflictError as e:
+		raise HTTPException(status_code=409, detail=str(e))
+
+
 @router.delete("/{id}", status_code=200)
 def delete_book(
     id: int,
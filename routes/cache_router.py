@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Depends
+from core.auth import get_current_user
+from services import cache as response_cache
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+@router.get("/stats")
+def get_cache_stats(current_user=Depends(get_current_user)):
+    return response_cache.stats()
@@ -0,0 +1,43 @@
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from dotenv import load_dotenv
+from core import metrics
+from core.compression import compression_stats
+from core.auth import token_cache
+from core.security import hashing_pool
+from db.pool import pool_stats
+from services import cache as response_cache
+
+load_dotenv()
+
+# /metrics no pide token (lo consulta Prometheus); solo responde a estas IPs cliente
+METRICS_ALLOWED_HOSTS = {
+    host.strip() for host in os.getenv("METRICS_ALLOWED_HOSTS", "127.0.0.1,::1").split(",") if host.strip()
+}
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(request: Request):
+    client_host = request.client.host if request.client else None
+    if client_host not in METRICS_ALLOWED_HOSTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    cache_lines = []
+    for name, stats in response_cache.stats().items():
+        cache_lines.extend(metrics.stats_lines("response_cache", stats, cache=name))
+    compression_lines = []
+    for encoding, stats in compression_stats.stats().items():
+        compression_lines.extend(metrics.stats_lines("response_compression", stats, encoding=encoding))
+    pool_lines = []
+    for name, stats in pool_stats().items():
+        pool_lines.extend(metrics.stats_lines("db_pool", stats, pool=name))
+    body = metrics.render(
+        metrics.stats_lines("auth_cache", token_cache.stats()),
+        cache_lines,
+        metrics.stats_lines("hashing_pool", hashing_pool.stats()),
+        compression_lines,
+        pool_lines,
+    )
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
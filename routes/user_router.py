@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from db.db import get_db
 from schemas.user_schema import UserCreate, UserLogin, Token
 from services.user.user_services import register_user, login_user
-from core.auth import get_current_user
+from core.security import hashing_pool
+from core.auth import get_current_user, token_cache, security, revoke_token
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -18,3 +20,19 @@ def login(data: UserLogin, db: Session = Depends(get_db)):
 @router.get("/profile")
 def get_profile(current_user = Depends(get_current_user)):
     return {"message": f"Welcome {current_user.username}"}
+
+@router.post("/logout")
+def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user = Depends(get_current_user)
+):
+    revoke_token(credentials.credentials)
+    return {"message": "Logged out"}
+
+@router.get("/auth-cache/stats")
+def get_auth_cache_stats(current_user = Depends(get_current_user)):
+    return token_cache.stats()
+
+@router.get("/hashing-pool/stats")
+def get_hashing_pool_stats(current_user = Depends(get_current_user)):
+    return hashing_pool.stats()
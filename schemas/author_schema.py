@@ -21,4 +21,14 @@ class AuthorOut(BaseModel):
 	nationality: Optional[str] = None
 	date_of_birth: Optional[str] = None
 	created_at: datetime
-	updated_at: datetime
\ No newline at end of file
+	updated_at: datetime
+
+
+class AuthorPage(BaseModel):
+	items: list[AuthorOut]
+	next_cursor: Optional[str] = None
+
+
+class AuthorBatch(BaseModel):
+	items: list[AuthorOut]
+	missing: list[int]
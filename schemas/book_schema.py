@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 from datetime import datetime
 
 from schemas.author_schema import AuthorOut
@@ -21,6 +21,8 @@ class UpdateBookSchema(BaseModel):
     isAvailable: Optional[bool] = None
 
 class BookOut(BaseModel):
+    model_config = {"from_attributes": True}
+
     id: int
     title: str
     isbn: str
@@ -30,6 +32,70 @@ class BookOut(BaseModel):
     is_available: bool = True
     created_at: datetime
     updated_at: datetime
-	
-    class Config:
-        orm_mode = True
\ No newline at end of file
+
+class BookNormalizedOut(BaseModel):
+    """Book without the embedded author, for the normalized list view."""
+    model_config = {"from_attributes": True}
+
+    id: int
+    title: str
+    isbn: str
+    author_id: int
+    published_year: Optional[int] = None
+    genre: Optional[str] = None
+    is_available: bool = True
+    created_at: datetime
+    updated_at: datetime
+
+class BookListNormalized(BaseModel):
+    books: list[BookNormalizedOut]
+    authors: dict[int, AuthorOut]
+    next_cursor: Optional[str] = None
+
+class BookPage(BaseModel):
+    items: list[BookOut]
+    next_cursor: Optional[str] = None
+
+
+class BookAvailabilityOut(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: int
+    is_available: bool
+    updated_at: datetime
+
+
+class BookBatch(BaseModel):
+    items: list[BookOut]
+    missing: list[int]
+
+
+class BulkImportError(BaseModel):
+    index: int
+    isbn: Optional[str] = None
+    detail: str
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: list[BulkImportError]
+
+
+class FacetCount(BaseModel):
+    value: Optional[Union[bool, int, str]] = None
+    count: int
+
+
+class AuthorFacet(BaseModel):
+    author_id: int
+    name: str
+    count: int
+
+
+class BookStats(BaseModel):
+    total: int
+    by_availability: list[FacetCount]
+    by_genre: list[FacetCount]
+    by_decade: list[FacetCount]
+    by_author: list[AuthorFacet]
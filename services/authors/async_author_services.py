@@ -0,0 +1,119 @@
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from models.author_model import Author
+from schemas.author_schema import AuthorOut, CreateAuthorSchema, UpdateAuthorSchema
+from services.exceptions import NotFoundError, BadRequestError
+from services import cache as response_cache
+from services import table_versions
+from services.batch import batch_result
+from services.authors.author_services import (
+    authors_statement, authors_offset_page, authors_keyset_page, authors_keyset_result,
+    authors_export_statement, EXPORT_BATCH_SIZE, authors_out, author_page_out, delete_author_statement,
+    insert_author_statement,
+)
+
+
+async def create_author(db: AsyncSession, data: CreateAuthorSchema):
+    if not data.name:
+        raise BadRequestError("Name is required to create an author")
+
+    new_author = (await db.scalars(insert_author_statement(data))).one()
+    await db.commit()
+    response_cache.invalidate_author()
+    return new_author
+
+
+async def _fetch(db: AsyncSession, query, fields: Optional[tuple]):
+    if fields:
+        result = await db.execute(query)
+        return [row._asdict() for row in result]
+    result = await db.scalars(query)
+    return result.all()
+
+
+async def get_authors(db: AsyncSession, page: int = 1, limit: int = 100, nationality: Optional[str] = None, name_prefix: str = "", fields: Optional[tuple] = None):
+    query = authors_statement(nationality, name_prefix, fields)
+    return await _fetch(db, authors_offset_page(query, page, limit), fields)
+
+
+async def get_authors_keyset(db: AsyncSession, limit: int = 100, nationality: Optional[str] = None, name_prefix: str = "", cursor: Optional[str] = None, fields: Optional[tuple] = None):
+    query = authors_statement(nationality, name_prefix, fields)
+    items = await _fetch(db, authors_keyset_page(query, limit, cursor), fields)
+    return authors_keyset_result(list(items), limit)
+
+
+async def export_authors(db: AsyncSession, batch_size: int = EXPORT_BATCH_SIZE):
+    result = await db.stream(authors_export_statement(batch_size))
+    async for row in result:
+        yield row._asdict()
+
+
+async def get_author_by_id(db: AsyncSession, author_id: int):
+    return await db.get(Author, author_id)
+
+
+async def get_author_cached(db: AsyncSession, author_id: int):
+    return await response_cache.aread_through(
+        response_cache.author_cache, author_id, lambda: get_author_by_id(db, author_id), AuthorOut.model_validate
+    )
+
+
+async def get_authors_by_ids(db: AsyncSession, ids: list[int]):
+    result = await db.scalars(select(Author).where(Author.id.in_(ids)))
+    return result.all()
+
+
+async def get_authors_batch_cached(db: AsyncSession, ids: list[int]):
+    found = await response_cache.aread_many(
+        response_cache.author_cache, ids, lambda missing: get_authors_by_ids(db, missing), AuthorOut.model_validate
+    )
+    return batch_result(ids, found)
+
+
+async def authors_version(db: AsyncSession) -> str:
+    return await table_versions.get_versions_async(db, "authors")
+
+
+async def get_authors_cached(db: AsyncSession, page: int = 1, limit: int = 100, nationality: Optional[str] = None, name_prefix: str = "", fields: Optional[tuple] = None, version: str = ""):
+    key = response_cache.list_key("authors", page=page, limit=limit, nationality=nationality, name_prefix=name_prefix, fields=fields, version=version)
+    return await response_cache.aread_through(
+        response_cache.list_cache, key,
+        lambda: get_authors(db, page, limit, nationality, name_prefix, fields), authors_out(fields)
+    )
+
+
+async def get_authors_keyset_cached(db: AsyncSession, limit: int = 100, nationality: Optional[str] = None, name_prefix: str = "", cursor: Optional[str] = None, fields: Optional[tuple] = None, version: str = ""):
+    key = response_cache.list_key("authors", cursor=cursor or "", limit=limit, nationality=nationality, name_prefix=name_prefix, fields=fields, version=version)
+    return await response_cache.aread_through(
+        response_cache.list_cache, key,
+        lambda: get_authors_keyset(db, limit, nationality, name_prefix, cursor, fields), author_page_out(fields)
+    )
+
+
+async def update_author(db: AsyncSession, id: int, author_data: UpdateAuthorSchema):
+    values = author_data.model_dump(exclude_unset=True)
+    values["updated_at"] = datetime.now(timezone.utc)
+
+    result = await db.scalars(update(Author).where(Author.id == id).values(**values).returning(Author))
+    found_author = result.one_or_none()
+    if not found_author:
+        raise NotFoundError("Author not found")
+
+    await db.commit()
+    response_cache.invalidate_author(id)
+    return found_author
+
+
+async def delete_author(db: AsyncSession, author_id: int):
+    result = await db.scalars(delete_author_statement(author_id))
+    found_author = result.one_or_none()
+    if not found_author:
+        if not await db.get(Author, author_id):
+            raise NotFoundError("Author not found")
+        raise BadRequestError("Cannot delete this author; books are associated")
+
+    await db.commit()
+    response_cache.invalidate_author(author_id)
+    return found_author
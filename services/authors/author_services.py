@@ -1,55 +1,206 @@
+import os
+from typing import Optional
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from models.author_model import Author
-from schemas.author_schema import CreateAuthorSchema, UpdateAuthorSchema
+from models.book_model import Book
+from schemas.author_schema import AuthorOut, CreateAuthorSchema, UpdateAuthorSchema
 from services.exceptions import NotFoundError, BadRequestError
+from services import cache as response_cache
+from services import table_versions
+from services.batch import batch_result
+from core.conditional import make_etag
+from services.pagination import encode_cursor, decode_cursor, keyset_condition, prefix_condition
+
+# Filas por lote al exportar en streaming
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
 
 
 def create_author(db: Session, data: CreateAuthorSchema):
     if not data.name:
         raise BadRequestError("Name is required to create an author")
 
-    new_author = Author(
+    # INSERT ... RETURNING: las fechas salen tal como quedan guardadas, igual que en GET /authors/{id}
+    new_author = db.scalars(insert_author_statement(data)).one()
+    db.commit()
+    response_cache.invalidate_author()
+    return new_author
+
+
+def insert_author_statement(data: CreateAuthorSchema):
+    return insert(Author).values(
         name=data.name,
         nationality=data.nationality,
-        date_of_birth=data.date_of_birth)
+        date_of_birth=data.date_of_birth,
+    ).returning(Author)
 
-    db.add(new_author)
-    db.commit()
-    db.refresh(new_author)
-    return new_author
+
+AUTHOR_FIELDS = ("id", "name", "nationality", "date_of_birth", "created_at", "updated_at")
+
+
+def parse_fields(fields: Optional[str]):
+    """Validates a `fields=` projection; `id` is always included so rows stay addressable."""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in AUTHOR_FIELDS]
+    if unknown:
+        raise BadRequestError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(field for field in AUTHOR_FIELDS if field == "id" or field in requested)
+
+
+def authors_statement(nationality: Optional[str] = None, name_prefix: str = "", fields: Optional[tuple] = None):
+    """Listing statement shared by the sync and async author services."""
+    if fields:
+        query = select(*[getattr(Author, field) for field in fields])
+    else:
+        query = select(Author)
+
+    if nationality:
+        query = query.where(Author.nationality == nationality)
+
+    if name_prefix:
+        # Rango en lugar de LIKE 'x%' para que SQLite pueda usar el índice sobre name
+        query = query.where(prefix_condition(Author.name, name_prefix))
+
+    return query
+
+
+def authors_offset_page(query, page: int = 1, limit: int = 100):
+    return query.order_by(Author.id).offset((page - 1) * limit).limit(limit)
+
+
+def authors_keyset_page(query, limit: int = 100, cursor: Optional[str] = None):
+    if cursor:
+        position = decode_cursor(cursor)
+        query = query.where(keyset_condition(Author.id, position["id"]))
+    return query.order_by(Author.id).limit(limit + 1)
+
+
+def authors_keyset_result(items: list, limit: int = 100):
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor({"id": last["id"] if isinstance(last, dict) else last.id})
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _fetch(db: Session, query, fields: Optional[tuple]):
+    if fields:
+        return [row._asdict() for row in db.execute(query)]
+    return db.scalars(query).all()
+
+
+def get_authors(db: Session, page: int = 1, limit: int = 100, nationality: Optional[str] = None, name_prefix: str = "", fields: Optional[tuple] = None):
+    query = authors_statement(nationality, name_prefix, fields)
+    return _fetch(db, authors_offset_page(query, page, limit), fields)
+
+
+def get_authors_keyset(db: Session, limit: int = 100, nationality: Optional[str] = None, name_prefix: str = "", cursor: Optional[str] = None, fields: Optional[tuple] = None):
+    query = authors_statement(nationality, name_prefix, fields)
+    items = _fetch(db, authors_keyset_page(query, limit, cursor), fields)
+    return authors_keyset_result(list(items), limit)
 
 
-def get_authors(db: Session):
-    return db.query(Author).all()
+AUTHOR_EXPORT_COLUMNS = ("id", "name", "nationality", "date_of_birth", "created_at", "updated_at")
+
+
+def authors_export_statement(batch_size: int = EXPORT_BATCH_SIZE):
+    columns = [getattr(Author, column) for column in AUTHOR_EXPORT_COLUMNS]
+    return select(*columns).order_by(Author.id).execution_options(yield_per=batch_size)
+
+
+def export_authors(db: Session, batch_size: int = EXPORT_BATCH_SIZE):
+    for row in db.execute(authors_export_statement(batch_size)):
+        yield row._asdict()
 
 
 def get_author_by_id(db: Session, author_id: int):
     return db.query(Author).filter(Author.id == author_id).first()
 
 
+def authors_out(fields: Optional[tuple]):
+    # Las proyecciones ya son diccionarios con solo las columnas pedidas
+    if fields:
+        return lambda authors: list(authors)
+    return lambda authors: [AuthorOut.model_validate(author) for author in authors]
+
+
+def author_page_out(fields: Optional[tuple]):
+    convert = authors_out(fields)
+    return lambda page: {"items": convert(page["items"]), "next_cursor": page["next_cursor"]}
+
+
+def get_author_cached(db: Session, author_id: int):
+    return response_cache.read_through(
+        response_cache.author_cache, author_id, lambda: get_author_by_id(db, author_id), AuthorOut.model_validate
+    )
+
+
+def get_authors_by_ids(db: Session, ids: list[int]):
+    return db.scalars(select(Author).where(Author.id.in_(ids))).all()
+
+
+def get_authors_batch_cached(db: Session, ids: list[int]):
+    found = response_cache.read_many(
+        response_cache.author_cache, ids, lambda missing: get_authors_by_ids(db, missing), AuthorOut.model_validate
+    )
+    return batch_result(ids, found)
+
+
+def authors_version(db: Session) -> str:
+    return table_versions.get_versions(db, "authors")
+
+
+def author_etag(author: AuthorOut) -> str:
+    return make_etag("author", author.id, author.updated_at)
+
+
+def get_authors_cached(db: Session, page: int = 1, limit: int = 100, nationality: Optional[str] = None, name_prefix: str = "", fields: Optional[tuple] = None, version: str = ""):
+    key = response_cache.list_key("authors", page=page, limit=limit, nationality=nationality, name_prefix=name_prefix, fields=fields, version=version)
+    return response_cache.read_through(
+        response_cache.list_cache, key,
+        lambda: get_authors(db, page, limit, nationality, name_prefix, fields), authors_out(fields)
+    )
+
+
+def get_authors_keyset_cached(db: Session, limit: int = 100, nationality: Optional[str] = None, name_prefix: str = "", cursor: Optional[str] = None, fields: Optional[tuple] = None, version: str = ""):
+    key = response_cache.list_key("authors", cursor=cursor or "", limit=limit, nationality=nationality, name_prefix=name_prefix, fields=fields, version=version)
+    return response_cache.read_through(
+        response_cache.list_cache, key,
+        lambda: get_authors_keyset(db, limit, nationality, name_prefix, cursor, fields), author_page_out(fields)
+    )
+
+
 def update_author(db: Session, id: int, author_data: UpdateAuthorSchema):
-    found_author = db.query(Author).filter(Author.id == id).first()
+    values = author_data.model_dump(exclude_unset=True)
+    values["updated_at"] = datetime.now(timezone.utc)
+
+    found_author = db.scalars(update(Author).where(Author.id == id).values(**values).returning(Author)).one_or_none()
     if not found_author:
         raise NotFoundError("Author not found")
 
-    for field, value in author_data.model_dump(exclude_unset=True).items():
-        setattr(found_author, field, value)
-    
-    found_author.updated_at = datetime.now(timezone.utc)
     db.commit()
-    db.refresh(found_author)
+    response_cache.invalidate_author(id)
     return found_author
 
 
+def delete_author_statement(author_id: int):
+    """DELETE that only matches when the author has no books (the EXISTS check runs in the same statement)."""
+    has_books = select(Book.id).where(Book.author_id == author_id).exists()
+    return delete(Author).where(Author.id == author_id, ~has_books).returning(Author)
+
+
 def delete_author(db: Session, author_id: int):
-    found_author = db.query(Author).filter(Author.id == author_id).first()
+    found_author = db.scalars(delete_author_statement(author_id)).one_or_none()
     if not found_author:
-        raise NotFoundError("Author not found")
-
-    if found_author.books:
+        # Solo en el caso de error se distingue "no existe" de "tiene libros"
+        if not db.get(Author, author_id):
+            raise NotFoundError("Author not found")
         raise BadRequestError("Cannot delete this author; books are associated")
 
-    db.delete(found_author)
     db.commit()
+    response_cache.invalidate_author(author_id)
     return found_author
@@ -0,0 +1,41 @@
+import os
+from dotenv import load_dotenv
+from services.exceptions import BadRequestError
+
+load_dotenv()
+
+# Máximo de ids por petición de las rutas /batch (se resuelven con un solo IN (...))
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", 100))
+# Mayor entero que SQLite admite como parámetro (INTEGER de 64 bits con signo)
+MAX_ID = 2 ** 63 - 1
+
+
+def parse_ids(raw: str) -> list[int]:
+    """Ids from "3,1,2" in request order, without duplicates."""
+    ids = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            id = int(part)
+        except ValueError:
+            raise BadRequestError(f"Invalid id: {part}")
+        if not 1 <= id <= MAX_ID:
+            raise BadRequestError(f"Invalid id: {part}")
+        ids.append(id)
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise BadRequestError("No ids given")
+    if len(ids) > BATCH_MAX_IDS:
+        raise BadRequestError(f"At most {BATCH_MAX_IDS} ids per request")
+    return ids
+
+
+def batch_result(ids: list[int], found: dict) -> dict:
+    """Found items in request order plus the ids that do not exist."""
+    return {
+        "items": [found[id] for id in ids if id in found],
+        "missing": [id for id in ids if id not in found],
+    }
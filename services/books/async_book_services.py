@@ -0,0 +1,187 @@
+from typing import Optional
+from sqlalchemy import delete, exists, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from models.book_model import Book
+from models.author_model import Author
+from schemas.book_schema import CreateBookSchema, UpdateBookSchema, BookOut
+from services.exceptions import NotFoundError, BadRequestError
+from services import cache as response_cache
+from services import table_versions
+from services.batch import batch_result
+from services.books.book_services import (
+	books_statement, offset_page, keyset_sort, count_statement, stats_statements, book_stats_out, keyset_page, keyset_result, books_export_statement, EXPORT_BATCH_SIZE, BookFilters,
+	books_out, book_page_out, books_normalized_out, book_page_normalized_out,
+	insert_book_statement, book_update_values, book_update_error, availability_statement, availability_error,
+)
+
+# Versión async de book_services: misma lógica y mismas sentencias de listado,
+# ejecutadas sobre AsyncSession (aiosqlite) en lugar del threadpool.
+
+async def create_book(db: AsyncSession, data: CreateBookSchema):
+
+	if not data.title or not data.author_id or not data.isbn:
+		raise BadRequestError("Missing data to create a book")
+
+	found_author = await db.get(Author, data.author_id)
+
+	if not found_author:
+		raise NotFoundError("Author not found")
+
+	try:
+		new_book = (await db.scalars(insert_book_statement(data))).one()
+		await db.commit()
+	except IntegrityError:
+		await db.rollback()
+		raise BadRequestError("A book with this ISBN already exists")
+
+	set_committed_value(new_book, "author", found_author)
+	response_cache.invalidate_book()
+	return new_book
+
+async def get_books(db: AsyncSession, page: int = 1, limit: int = 10, isAvailable: bool = False, title: str = "", search: str = "", normalized: bool = False, filters: Optional[BookFilters] = None):
+	query, rank = books_statement(db, isAvailable, title, search, normalized, filters)
+	result = await db.scalars(offset_page(query, rank, page, limit, filters.sort if filters else None))
+	return result.all()
+
+
+async def get_books_keyset(db: AsyncSession, limit: int = 10, isAvailable: bool = False, title: str = "", cursor: Optional[str] = None, search: str = "", normalized: bool = False, filters: Optional[BookFilters] = None):
+	sort = keyset_sort(cursor, filters.sort if filters else None)
+	query, _ = books_statement(db, isAvailable, title, search, normalized, filters)
+	result = await db.scalars(keyset_page(query, limit, cursor, sort))
+	return keyset_result(list(result.all()), limit, sort)
+
+
+async def export_books(db: AsyncSession, batch_size: int = EXPORT_BATCH_SIZE):
+	result = await db.stream(books_export_statement(batch_size))
+	async for row in result:
+		yield row._asdict()
+
+
+async def get_book_by_id(db: AsyncSession, book_id: int):
+	return await db.scalar(select(Book).options(joinedload(Book.author)).where(Book.id == book_id))
+
+
+async def get_book_cached(db: AsyncSession, book_id: int):
+	return await response_cache.aread_through(
+		response_cache.book_cache, book_id, lambda: get_book_by_id(db, book_id), BookOut.model_validate
+	)
+
+
+async def get_books_by_ids(db: AsyncSession, ids: list[int]):
+	result = await db.scalars(select(Book).options(joinedload(Book.author)).where(Book.id.in_(ids)))
+	return result.all()
+
+
+async def get_books_batch_cached(db: AsyncSession, ids: list[int]):
+	found = await response_cache.aread_many(
+		response_cache.book_cache, ids, lambda missing: get_books_by_ids(db, missing), BookOut.model_validate
+	)
+	return batch_result(ids, found)
+
+
+async def books_version(db: AsyncSession) -> str:
+	return await table_versions.get_versions_async(db, "books", "authors")
+
+
+async def get_books_cached(db: AsyncSession, page: int = 1, limit: int = 10, isAvailable: bool = False, title: str = "", search: str = "", normalized: bool = False, version: str = "", filters: BookFilters = BookFilters()):
+	key = response_cache.list_key("books", page=page, limit=limit, isAvailable=isAvailable, title=title, search=search, normalized=normalized, version=version, **filters.key_params())
+	return await response_cache.aread_through(
+		response_cache.list_cache, key, lambda: get_books(db, page, limit, isAvailable, title, search, normalized, filters),
+		books_normalized_out if normalized else books_out,
+	)
+
+
+async def count_books(db: AsyncSession, isAvailable: bool = False, title: str = "", search: str = "", filters: Optional[BookFilters] = None) -> int:
+	return await db.scalar(count_statement(db, isAvailable, title, search, filters))
+
+
+async def count_books_cached(db: AsyncSession, isAvailable: bool = False, title: str = "", search: str = "", version: str = "", filters: BookFilters = BookFilters()) -> int:
+	key = response_cache.list_key("books", count=True, isAvailable=isAvailable, title=title, search=search, version=version, **filters.key_params())
+	return await response_cache.aread_through(
+		response_cache.list_cache, key, lambda: count_books(db, isAvailable, title, search, filters), int
+	)
+
+
+async def get_book_stats(db: AsyncSession) -> dict:
+	return {name: (await db.execute(statement)).all() for name, statement in stats_statements().items()}
+
+
+async def get_book_stats_cached(db: AsyncSession, version: str = ""):
+	key = response_cache.list_key("books", stats=True, version=version)
+	return await response_cache.aread_through(response_cache.list_cache, key, lambda: get_book_stats(db), book_stats_out)
+
+
+async def get_books_keyset_cached(db: AsyncSession, limit: int = 10, isAvailable: bool = False, title: str = "", cursor: Optional[str] = None, search: str = "", normalized: bool = False, version: str = "", filters: BookFilters = BookFilters()):
+	key = response_cache.list_key("books", cursor=cursor or "", limit=limit, isAvailable=isAvailable, title=title, search=search, normalized=normalized, version=version, **filters.key_params())
+	return await response_cache.aread_through(
+		response_cache.list_cache, key, lambda: get_books_keyset(db, limit, isAvailable, title, cursor, search, normalized, filters),
+		book_page_normalized_out if normalized else book_page_out,
+	)
+
+
+async def update_book(db: AsyncSession, id: int, book_data: UpdateBookSchema):
+	values = book_update_values(book_data)
+
+	found_author = None
+	if values.get("author_id") is not None:
+		found_author = await db.get(Author, values["author_id"])
+		if not found_author:
+			if not await db.scalar(select(exists().where(Book.id == id))):
+				raise NotFoundError("Book not found")
+			raise NotFoundError("Author not found")
+
+	if not values:
+		found_book = await get_book_by_id(db, id)
+		if not found_book:
+			raise NotFoundError("Book not found")
+		return found_book
+
+	try:
+		result = await db.scalars(update(Book).where(Book.id == id).values(**values).returning(Book))
+		found_book = result.one_or_none()
+	except IntegrityError as e:
+		await db.rollback()
+		raise book_update_error(e)
+	if not found_book:
+		raise NotFoundError("Book not found")
+	await db.commit()
+
+	if found_author is not None or "author" in inspect(found_book).unloaded:
+		set_committed_value(found_book, "author", found_author or await db.get(Author, found_book.author_id))
+	response_cache.invalidate_book(id)
+	return found_book
+
+
+async def set_availability(db: AsyncSession, book_id: int, available: bool):
+	changed = (await db.execute(availability_statement(book_id, available))).one_or_none()
+	if not changed:
+		await db.rollback()
+		if not await db.scalar(select(exists().where(Book.id == book_id))):
+			raise NotFoundError("Book not found")
+		raise availability_error(available)
+
+	await db.commit()
+	response_cache.invalidate_book(book_id)
+	return changed
+
+
+async def checkout_book(db: AsyncSession, book_id: int):
+	return await set_availability(db, book_id, False)
+
+
+async def return_book(db: AsyncSession, book_id: int):
+	return await set_availability(db, book_id, True)
+
+
+async def delete_book(db: AsyncSession, book_id: int):
+	result = await db.scalars(delete(Book).where(Book.id == book_id).returning(Book))
+	found_book = result.one_or_none()
+	if not found_book:
+		raise NotFoundError("Book not found")
+
+	await db.commit()
+	response_cache.invalidate_book(book_id)
+	return found_book
@@ -1,41 +1,204 @@
-from sqlalchemy.orm import Session, joinedload
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+from pydantic import ValidationError
+from sqlalchemy import delete, exists, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from models.book_model import Book
 from models.author_model import Author
-from schemas.book_schema import CreateBookSchema, UpdateBookSchema
-from services.exceptions import NotFoundError, BadRequestError
+from schemas.author_schema import AuthorOut
+from schemas.book_schema import CreateBookSchema, UpdateBookSchema, BookOut, BookNormalizedOut, BookStats
+from services.exceptions import NotFoundError, BadRequestError, ConflictError
+from services import cache as response_cache
+from services.books import search_index
+from services import table_versions
+from services.batch import batch_result
+from core.conditional import make_etag
+from services.pagination import encode_cursor, decode_cursor, keyset_condition, prefix_condition
+
+# Filas por lote en la importación masiva (una consulta de validación y un executemany por lote)
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 1000))
+# Filas por lote al exportar en streaming
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# Autores con más libros que devuelve GET /books/stats
+STATS_AUTHOR_LIMIT = int(os.getenv("STATS_AUTHOR_LIMIT", 20))
 
 def create_book(db: Session, data: CreateBookSchema):
 
 	if not data.title or not data.author_id or not data.isbn:
 		raise BadRequestError("Missing data to create a book")
 
-	found_author = db.query(Author).filter(Author.id == data.author_id).first()
+	found_author = db.get(Author, data.author_id)
 
 	if not found_author:
 		raise NotFoundError("Author not found")
 
-	existing_book = db.query(Book).filter(Book.isbn == data.isbn).first()
-
-	if existing_book:
+	# INSERT ... RETURNING: el índice único de isbn detecta el duplicado sin una consulta previa
+	try:
+		new_book = db.scalars(insert_book_statement(data)).one()
+		db.commit()
+	except IntegrityError:
+		db.rollback()
 		raise BadRequestError("A book with this ISBN already exists")
 
-	new_book = Book(
+	set_committed_value(new_book, "author", found_author)
+	response_cache.invalidate_book()
+	return new_book
+
+
+def insert_book_statement(data: CreateBookSchema):
+	return insert(Book).values(
 		title=data.title,
 		isbn=data.isbn,
 		author_id=data.author_id,
 		genre=data.genre,
 		published_year=data.published_year,
 		is_available=data.isAvailable,
-	)
+	).returning(Book)
 
-	db.add(new_book)
-	db.commit()
-	db.refresh(new_book)
-	return new_book
 
-def get_books(db: Session, page: int = 1, limit: int = 10, isAvailable: bool = False, title: str = ""):
-    skip = (page - 1) * limit
-    query = db.query(Book).options(joinedload(Book.author))
+def _parse_bulk_row(raw):
+	# Las filas NDJSON llegan como texto; las de un array JSON ya decodificadas
+	if isinstance(raw, (str, bytes)):
+		try:
+			raw = json.loads(raw)
+		except ValueError:
+			raise BadRequestError("Invalid JSON")
+
+	try:
+		data = CreateBookSchema.model_validate(raw)
+	except ValidationError as e:
+		raise BadRequestError("; ".join(
+			f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+		))
+
+	if not data.title or not data.author_id or not data.isbn:
+		raise BadRequestError("Missing data to create a book")
+	return data
+
+
+def import_books_chunk(db: Session, rows: list, start: int = 0, seen_isbns: Optional[set] = None):
+	"""Validates one chunk of rows with set-based lookups and inserts it with a single executemany."""
+	seen_isbns = set() if seen_isbns is None else seen_isbns
+	errors = []
+	candidates = []
+
+	for index, raw in enumerate(rows, start):
+		try:
+			candidates.append((index, _parse_bulk_row(raw)))
+		except BadRequestError as e:
+			isbn = raw.get("isbn") if isinstance(raw, dict) else None
+			isbn = str(isbn) if isbn is not None else None
+			errors.append({"index": index, "isbn": isbn, "detail": str(e)})
+
+	author_ids = {data.author_id for _, data in candidates}
+	isbns = {data.isbn for _, data in candidates}
+	existing_authors = set(db.scalars(select(Author.id).where(Author.id.in_(author_ids)))) if author_ids else set()
+	existing_isbns = set(db.scalars(select(Book.isbn).where(Book.isbn.in_(isbns)))) if isbns else set()
+
+	accepted = []
+	for index, data in candidates:
+		if data.author_id not in existing_authors:
+			errors.append({"index": index, "isbn": data.isbn, "detail": "Author not found"})
+		elif data.isbn in existing_isbns or data.isbn in seen_isbns:
+			errors.append({"index": index, "isbn": data.isbn, "detail": "A book with this ISBN already exists"})
+		else:
+			seen_isbns.add(data.isbn)
+			accepted.append((index, data))
+
+	if accepted:
+		values = [{
+			"title": data.title,
+			"isbn": data.isbn,
+			"author_id": data.author_id,
+			"genre": data.genre,
+			"published_year": data.published_year,
+			"is_available": data.isAvailable,
+		} for _, data in accepted]
+		try:
+			db.execute(insert(Book), values)
+			db.commit()
+		except IntegrityError:
+			# Otro escritor insertó alguno de estos ISBN entre la validación y el insert:
+			# el lote se deshizo entero, así que se reintenta fila a fila y solo fallan las que chocan
+			db.rollback()
+			accepted = _insert_rows_one_by_one(db, accepted, values, errors, seen_isbns)
+		if accepted:
+			response_cache.invalidate_book()
+
+	errors.sort(key=lambda error: error["index"])
+	return {"created": len(accepted), "failed": len(errors), "errors": errors}
+
+
+def _insert_rows_one_by_one(db: Session, accepted: list, values: list, errors: list, seen_isbns: set):
+	inserted = []
+	for (index, data), row in zip(accepted, values):
+		try:
+			db.execute(insert(Book), row)
+			db.commit()
+			inserted.append((index, data))
+		except IntegrityError:
+			db.rollback()
+			errors.append({"index": index, "isbn": data.isbn, "detail": "A book with this ISBN already exists"})
+			seen_isbns.discard(data.isbn)
+	return inserted
+
+
+def merge_import_results(total: dict, chunk: dict):
+	total["created"] += chunk["created"]
+	total["failed"] += chunk["failed"]
+	total["errors"].extend(chunk["errors"])
+	return total
+
+
+def bulk_create_books(db: Session, rows: list, chunk_size: int = BULK_CHUNK_SIZE):
+	result = {"created": 0, "failed": 0, "errors": []}
+	seen_isbns = set()
+	for start in range(0, len(rows), chunk_size):
+		chunk = import_books_chunk(db, rows[start:start + chunk_size], start, seen_isbns)
+		merge_import_results(result, chunk)
+	return result
+
+# Columnas por las que se puede ordenar: todas tienen un índice que empieza por
+# ellas, así que el orden (columna, id) sale del índice sin ordenar la tabla
+BOOK_SORTS = {"id": Book.id, "published_year": Book.published_year, "isbn": Book.isbn}
+BOOK_SORT_OPTIONS = tuple(option for name in BOOK_SORTS for option in (name, f"-{name}"))
+
+
+@dataclass(frozen=True)
+class BookFilters:
+    """Optional filters and sort of the book listing (`-column` sorts descending)."""
+    genre: Optional[str] = None
+    author_id: Optional[int] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    isbn_prefix: str = ""
+    sort: Optional[str] = None
+
+    def key_params(self) -> dict:
+        """Parameters for the response-cache key of a listing."""
+        return asdict(self)
+
+
+def parse_sort(sort: Optional[str]):
+    name = sort or "id"
+    descending = name.startswith("-")
+    column = BOOK_SORTS.get(name.removeprefix("-"))
+    if column is None:
+        raise BadRequestError(f"Invalid sort: {name}")
+    return column, descending
+
+
+def books_statement(db, isAvailable: bool = False, title: str = "", search: str = "", normalized: bool = False, filters: Optional[BookFilters] = None):
+    """Listing statement shared by the sync and async book services."""
+    # Vista normalizada: los autores se cargan aparte con un solo IN por página
+    # (selectinload) en lugar de repetir sus columnas en cada fila del JOIN
+    loader = selectinload(Book.author) if normalized else joinedload(Book.author)
+    query = select(Book).options(loader)
+    rank = None
 
     if isAvailable:
         query = query.filter(Book.is_available == True)
@@ -43,43 +206,347 @@ def get_books(db: Session, page: int = 1, limit: int = 10, isAvailable: bool = F
     if title:
         query = query.filter(Book.title.ilike(f"%{title}%"))
 
-    return query.offset(skip).limit(limit).all()
+    if filters:
+        query = apply_filters(query, filters)
+
+    if search:
+        if search_index.is_supported(db):
+            query, rank = search_index.apply_search(query, Book.id, search)
+        else:
+            query = query.filter(Book.title.ilike(f"%{search}%"))
+
+    return query, rank
+
+
+def apply_filters(query, filters: BookFilters):
+    # Igualdades y rangos sobre columnas indexadas: author_id, (genre, published_year),
+    # published_year e isbn. El prefijo de ISBN es un rango para poder usar su índice
+    if filters.genre:
+        query = query.filter(Book.genre == filters.genre)
+    if filters.author_id is not None:
+        query = query.filter(Book.author_id == filters.author_id)
+    if filters.year_from is not None:
+        query = query.filter(Book.published_year >= filters.year_from)
+    if filters.year_to is not None:
+        query = query.filter(Book.published_year <= filters.year_to)
+    if filters.isbn_prefix:
+        query = query.filter(prefix_condition(Book.isbn, filters.isbn_prefix))
+    return query
+
+
+def sort_order(sort: Optional[str]):
+    column, descending = parse_sort(sort)
+    columns = (column, Book.id) if column is not Book.id else (Book.id,)
+    return [col.desc() if descending else col for col in columns]
+
+
+def offset_page(query, rank, page: int = 1, limit: int = 10, sort: Optional[str] = None):
+    skip = (page - 1) * limit
+    # Con búsqueda de texto completo y sin sort explícito se ordena por relevancia (bm25)
+    if sort is None and rank is not None:
+        order = (rank, Book.id)
+    else:
+        order = sort_order(sort)
+    return query.order_by(*order).offset(skip).limit(limit)
+
+
+def keyset_sort(cursor: Optional[str], sort: Optional[str] = None) -> str:
+	"""Sort of a keyset page: the cursor keeps the sort of the page that produced it."""
+	if not cursor:
+		return sort or "id"
+	cursor_sort = decode_cursor(cursor, BOOK_SORT_OPTIONS).get("sort", "id")
+	if sort and sort != cursor_sort:
+		raise BadRequestError("The cursor belongs to a different sort")
+	return cursor_sort
+
+
+def keyset_page(query, limit: int = 10, cursor: Optional[str] = None, sort: str = "id"):
+	# El cursor exige un orden estable (columna, id), así que aquí la búsqueda solo filtra
+	column, descending = parse_sort(sort)
+	if cursor:
+		position = decode_cursor(cursor, BOOK_SORT_OPTIONS)
+		if column is Book.id:
+			query = query.filter(keyset_condition(Book.id, position["id"], descending=descending))
+		else:
+			query = query.filter(keyset_condition(Book.id, position["id"], column, position.get("value"), descending))
+
+	# Se pide una fila extra para saber si existe una página siguiente
+	return query.order_by(*sort_order(sort)).limit(limit + 1)
+
+
+def keyset_result(books: list, limit: int = 10, sort: str = "id"):
+	next_cursor = None
+	if len(books) > limit:
+		books = books[:limit]
+		position = {"id": books[-1].id}
+		if sort != "id":
+			column, _ = parse_sort(sort)
+			position["sort"] = sort
+			if column is not Book.id:
+				position["value"] = getattr(books[-1], column.key)
+		next_cursor = encode_cursor(position)
+
+	return {"items": books, "next_cursor": next_cursor}
+
+
+def get_books(db: Session, page: int = 1, limit: int = 10, isAvailable: bool = False, title: str = "", search: str = "", normalized: bool = False, filters: Optional[BookFilters] = None):
+    query, rank = books_statement(db, isAvailable, title, search, normalized, filters)
+    return db.scalars(offset_page(query, rank, page, limit, filters.sort if filters else None)).all()
+
+
+def get_books_keyset(db: Session, limit: int = 10, isAvailable: bool = False, title: str = "", cursor: Optional[str] = None, search: str = "", normalized: bool = False, filters: Optional[BookFilters] = None):
+	sort = keyset_sort(cursor, filters.sort if filters else None)
+	query, _ = books_statement(db, isAvailable, title, search, normalized, filters)
+	books = db.scalars(keyset_page(query, limit, cursor, sort)).all()
+	return keyset_result(list(books), limit, sort)
+
+
+BOOK_EXPORT_COLUMNS = (
+	"id", "title", "isbn", "author_id", "author_name", "published_year",
+	"genre", "is_available", "created_at", "updated_at",
+)
+
+
+def books_export_statement(batch_size: int = EXPORT_BATCH_SIZE):
+	# Filas planas (sin objetos ORM) leídas por lotes con un cursor del servidor
+	return (
+		select(
+			Book.id, Book.title, Book.isbn, Book.author_id, Author.name.label("author_name"),
+			Book.published_year, Book.genre, Book.is_available, Book.created_at, Book.updated_at,
+		)
+		.join(Author, Author.id == Book.author_id)
+		.order_by(Book.id)
+		.execution_options(yield_per=batch_size)
+	)
+
+
+def export_books(db: Session, batch_size: int = EXPORT_BATCH_SIZE):
+	for row in db.execute(books_export_statement(batch_size)):
+		yield row._asdict()
 
 
 def get_book_by_id(db: Session, book_id: int):
     return db.query(Book).options(joinedload(Book.author)).filter(Book.id == book_id).first()
 
 
+def books_out(books):
+	return [BookOut.model_validate(book) for book in books]
+
+
+def book_page_out(page: dict):
+	return {"items": books_out(page["items"]), "next_cursor": page["next_cursor"]}
+
+
+def books_normalized_out(books, next_cursor: Optional[str] = None):
+	"""Books with `author_id` plus each distinct author once."""
+	authors = {}
+	for book in books:
+		if book.author_id not in authors:
+			authors[book.author_id] = AuthorOut.model_validate(book.author)
+	return {
+		"books": [BookNormalizedOut.model_validate(book) for book in books],
+		"authors": authors,
+		"next_cursor": next_cursor,
+	}
+
+
+def book_page_normalized_out(page: dict):
+	return books_normalized_out(page["items"], page["next_cursor"])
+
+
+def get_book_cached(db: Session, book_id: int):
+	return response_cache.read_through(
+		response_cache.book_cache, book_id, lambda: get_book_by_id(db, book_id), BookOut.model_validate
+	)
+
+
+def get_books_by_ids(db: Session, ids: list[int]):
+	return db.scalars(select(Book).options(joinedload(Book.author)).where(Book.id.in_(ids))).all()
+
+
+def get_books_batch_cached(db: Session, ids: list[int]):
+	# Los ids ya cacheados no van a la base; el resto se pide con un solo IN (...)
+	found = response_cache.read_many(
+		response_cache.book_cache, ids, lambda missing: get_books_by_ids(db, missing), BookOut.model_validate
+	)
+	return batch_result(ids, found)
+
+
+def books_version(db: Session) -> str:
+	# Los libros incrustan a su autor: el listado cambia si cambia cualquiera de las dos tablas
+	return table_versions.get_versions(db, "books", "authors")
+
+
+def book_etag(book: BookOut) -> str:
+	return make_etag("book", book.id, book.updated_at, book.author.updated_at)
+
+
+def count_statement(db, isAvailable: bool = False, title: str = "", search: str = "", filters: Optional[BookFilters] = None):
+	"""COUNT(*) of a listing with the same filters (X-Total-Count)."""
+	query, _ = books_statement(db, isAvailable, title, search, filters=filters)
+	return select(func.count()).select_from(query.with_only_columns(Book.id).subquery())
+
+
+def count_books(db: Session, isAvailable: bool = False, title: str = "", search: str = "", filters: Optional[BookFilters] = None) -> int:
+	return db.scalar(count_statement(db, isAvailable, title, search, filters))
+
+
+def count_books_cached(db: Session, isAvailable: bool = False, title: str = "", search: str = "", version: str = "", filters: BookFilters = BookFilters()) -> int:
+	# La versión de las tablas va en la clave: el total se recalcula solo tras una escritura
+	key = response_cache.list_key("books", count=True, isAvailable=isAvailable, title=title, search=search, version=version, **filters.key_params())
+	return response_cache.read_through(
+		response_cache.list_cache, key, lambda: count_books(db, isAvailable, title, search, filters), int
+	)
+
+
+def stats_statements(author_limit: int = STATS_AUTHOR_LIMIT) -> dict:
+	"""One GROUP BY per facet; each one reads a covering index instead of the table."""
+	count = func.count().label("count")
+	decade = (Book.published_year // 10 * 10).label("decade")
+	# Se agrupa primero y se une con authors solo para los autores del top
+	top_authors = (
+		select(Book.author_id, count).group_by(Book.author_id).order_by(count.desc(), Book.author_id).limit(author_limit)
+	).subquery()
+	return {
+		"by_availability": select(Book.is_available, count).group_by(Book.is_available).order_by(Book.is_available.desc()),
+		"by_genre": select(Book.genre, count).group_by(Book.genre).order_by(count.desc(), Book.genre),
+		"by_decade": select(decade, count).group_by("decade").order_by("decade"),
+		"by_author": (
+			select(top_authors.c.author_id, Author.name, top_authors.c.count)
+			.join(Author, Author.id == top_authors.c.author_id)
+			.order_by(top_authors.c.count.desc(), top_authors.c.author_id)
+		),
+	}
+
+
+def book_stats_out(rows: dict) -> BookStats:
+	facets = {
+		name: [{"value": value, "count": count} for value, count in rows[name]]
+		for name in ("by_availability", "by_genre", "by_decade")
+	}
+	return BookStats(
+		# El total sale de la faceta de disponibilidad, sin un COUNT(*) aparte
+		total=sum(facet["count"] for facet in facets["by_availability"]),
+		by_author=[{"author_id": author_id, "name": name, "count": count} for author_id, name, count in rows["by_author"]],
+		**facets,
+	)
+
+
+def get_book_stats(db: Session) -> dict:
+	return {name: db.execute(statement).all() for name, statement in stats_statements().items()}
+
+
+def get_book_stats_cached(db: Session, version: str = "") -> BookStats:
+	key = response_cache.list_key("books", stats=True, version=version)
+	return response_cache.read_through(response_cache.list_cache, key, lambda: get_book_stats(db), book_stats_out)
+
+
+def get_books_cached(db: Session, page: int = 1, limit: int = 10, isAvailable: bool = False, title: str = "", search: str = "", normalized: bool = False, version: str = "", filters: BookFilters = BookFilters()):
+	key = response_cache.list_key("books", page=page, limit=limit, isAvailable=isAvailable, title=title, search=search, normalized=normalized, version=version, **filters.key_params())
+	return response_cache.read_through(
+		response_cache.list_cache, key, lambda: get_books(db, page, limit, isAvailable, title, search, normalized, filters),
+		books_normalized_out if normalized else books_out,
+	)
+
+
+def get_books_keyset_cached(db: Session, limit: int = 10, isAvailable: bool = False, title: str = "", cursor: Optional[str] = None, search: str = "", normalized: bool = False, version: str = "", filters: BookFilters = BookFilters()):
+	key = response_cache.list_key("books", cursor=cursor or "", limit=limit, isAvailable=isAvailable, title=title, search=search, normalized=normalized, version=version, **filters.key_params())
+	return response_cache.read_through(
+		response_cache.list_cache, key, lambda: get_books_keyset(db, limit, isAvailable, title, cursor, search, normalized, filters),
+		book_page_normalized_out if normalized else book_page_out,
+	)
+
+
+def book_update_values(book_data: UpdateBookSchema) -> dict:
+	"""Column values for an UPDATE from the fields the client actually sent."""
+	values = {}
+	for field, value in book_data.model_dump(exclude_unset=True).items():
+		values["is_available" if field == "isAvailable" else field] = value
+	return values
+
+
+def book_update_error(error: IntegrityError) -> BadRequestError:
+	if "UNIQUE" in str(error.orig):
+		return BadRequestError("A book with this ISBN already exists")
+	return BadRequestError("Invalid data to update a book")
+
+
 def update_book(db: Session, id: int, book_data: UpdateBookSchema):
-	found_book = db.query(Book).filter(Book.id == id).first()
+	values = book_update_values(book_data)
+
+	found_author = None
+	if values.get("author_id") is not None:
+		found_author = db.get(Author, values["author_id"])
+		if not found_author:
+			if not db.scalar(select(exists().where(Book.id == id))):
+				raise NotFoundError("Book not found")
+			raise NotFoundError("Author not found")
+
+	if not values:
+		found_book = get_book_by_id(db, id)
+		if not found_book:
+			raise NotFoundError("Book not found")
+		return found_book
+
+	# UPDATE ... RETURNING: la existencia del libro se comprueba con la propia sentencia
+	try:
+		found_book = db.scalars(update(Book).where(Book.id == id).values(**values).returning(Book)).one_or_none()
+	except IntegrityError as e:
+		db.rollback()
+		raise book_update_error(e)
 	if not found_book:
 		raise NotFoundError("Book not found")
-	
-	update_dict = book_data.model_dump(exclude_unset=True)
-	if "author_id" in update_dict:
-		author_id = update_dict["author_id"]
-		if author_id is not None:
-			found_author = db.query(Author).filter(Author.id == author_id).first()
-			if not found_author:
-				raise NotFoundError("Author not found")
-
-	for field, value in update_dict.items():
-		if field == "isAvailable":
-			setattr(found_book, "is_available", value)
-		else:
-			setattr(found_book, field, value)
-
 	db.commit()
-	db.refresh(found_book)
+
+	if found_author is not None or "author" in inspect(found_book).unloaded:
+		set_committed_value(found_book, "author", found_author or db.get(Author, found_book.author_id))
+	response_cache.invalidate_book(id)
 	return found_book
 
 
 
+def availability_statement(book_id: int, available: bool):
+	# Un solo UPDATE condicional: solo cambia la fila si está en el estado contrario,
+	# así dos préstamos simultáneos del mismo libro no pueden tener éxito a la vez
+	return (
+		update(Book)
+		.where(Book.id == book_id, Book.is_available == (not available))
+		.values(is_available=available)
+		.returning(Book.id, Book.is_available, Book.updated_at)
+	)
+
+
+def availability_error(available: bool) -> ConflictError:
+	return ConflictError("Book is not checked out" if available else "Book is already checked out")
+
+
+def set_availability(db: Session, book_id: int, available: bool):
+	changed = db.execute(availability_statement(book_id, available)).one_or_none()
+	if not changed:
+		# Se suelta el bloqueo de escritura antes de averiguar el motivo
+		db.rollback()
+		if not db.scalar(select(exists().where(Book.id == book_id))):
+			raise NotFoundError("Book not found")
+		raise availability_error(available)
+
+	db.commit()
+	response_cache.invalidate_book(book_id)
+	return changed
+
+
+def checkout_book(db: Session, book_id: int):
+	return set_availability(db, book_id, False)
+
+
+def return_book(db: Session, book_id: int):
+	return set_availability(db, book_id, True)
+
+
 def delete_book(db: Session, book_id: int):
-	found_book = db.query(Book).filter(Book.id == book_id).first()
+	found_book = db.scalars(delete(Book).where(Book.id == book_id).returning(Book)).one_or_none()
 	if not found_book:
 		raise NotFoundError("Book not found")
 
-	db.delete(found_book)
 	db.commit()
-	return found_book
\ No newline at end of file
+	response_cache.invalidate_book(book_id)
+	return found_book
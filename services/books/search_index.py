@@ -0,0 +1,107 @@
+import re
+from sqlalchemy import column, event, func, literal_column, table, text
+from db.db import Base
+
+# Índice de texto completo (SQLite FTS5) sobre título, género y nombre del autor.
+# El rowid de books_fts coincide con books.id. Los triggers mantienen el índice
+# sincronizado con cualquier escritura sobre books/authors, incluidas las de
+# create_book, update_book y delete_book, sin consultas adicionales desde Python.
+
+FTS_TABLE = "books_fts"
+
+_CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, genre, author_name,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, genre, author_name)
+        VALUES (
+            new.id, new.title, coalesce(new.genre, ''),
+            coalesce((SELECT name FROM authors WHERE id = new.author_id), '')
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, genre, author_id ON books BEGIN
+        UPDATE {FTS_TABLE} SET
+            title = new.title,
+            genre = coalesce(new.genre, ''),
+            author_name = coalesce((SELECT name FROM authors WHERE id = new.author_id), '')
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS authors_fts_au AFTER UPDATE OF name ON authors BEGIN
+        UPDATE {FTS_TABLE} SET author_name = new.name
+        WHERE rowid IN (SELECT id FROM books WHERE author_id = new.id);
+    END
+    """,
+]
+
+_BACKFILL_STATEMENT = f"""
+    INSERT INTO {FTS_TABLE}(rowid, title, genre, author_name)
+    SELECT books.id, books.title, coalesce(books.genre, ''), coalesce(authors.name, '')
+    FROM books LEFT JOIN authors ON authors.id = books.author_id
+"""
+
+books_fts = table(FTS_TABLE, column("rowid"))
+
+# Pesos de bm25 por columna: título, género, autor
+_RANK = func.bm25(literal_column(FTS_TABLE), 10.0, 1.0, 5.0)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first()
+    if exists:
+        return
+
+    for statement in _CREATE_STATEMENTS:
+        connection.execute(text(statement))
+    # Bases de datos existentes: indexar los libros que ya estaban cargados
+    connection.execute(text(_BACKFILL_STATEMENT))
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_index(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def is_supported(db) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def match_expression(search: str) -> str:
+    """Converts free text into an FTS5 query: every word must match as a prefix."""
+    terms = re.findall(r"\w+", search)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def apply_search(query, id_column, search: str):
+    """Restricts a query to the books matching `search`. Returns (query, rank)."""
+    expression = match_expression(search)
+    if not expression:
+        return query, None
+
+    query = query.join(books_fts, books_fts.c.rowid == id_column).filter(
+        literal_column(FTS_TABLE).op("MATCH")(expression)
+    )
+    return query, _RANK
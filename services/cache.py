@@ -0,0 +1,125 @@
+import os
+from typing import Any, Callable, Hashable
+from dotenv import load_dotenv
+from pydantic_core import to_json
+from core.cache import TTLCache
+
+load_dotenv()
+
+# Caché de lecturas delante de los servicios de libros y autores. Guarda los
+# esquemas de salida ya construidos (BookOut/AuthorOut), nunca objetos ORM, y se
+# invalida desde las funciones de escritura de cada servicio. Es local a cada
+# proceso: con varios workers un cambio puede tardar hasta el TTL en verse en
+# los demás.
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 2048))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 30))
+
+book_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+author_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+list_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+
+CACHES = {"books": book_cache, "authors": author_cache, "lists": list_cache}
+
+
+def list_key(resource: str, **params) -> tuple:
+    """Normalized key for a listing query: parameter order and text case do not matter."""
+    normalized = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, str):
+            value = value.strip().lower() if name in ("title", "search") else value.strip()
+        elif isinstance(value, (list, set)):
+            value = tuple(value)
+        normalized.append((name, value))
+    return (resource, tuple(normalized))
+
+
+def _size(value: Any) -> int:
+    return len(to_json(value))
+
+
+def read_through(cache: TTLCache, key: Hashable, loader: Callable[[], Any], convert: Callable[[Any], Any]):
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    loaded = loader()
+    if loaded is None:
+        return None
+    value = convert(loaded)
+    cache.set(key, value, size=_size(value))
+    return value
+
+
+async def aread_through(cache: TTLCache, key: Hashable, loader, convert: Callable[[Any], Any]):
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    loaded = await loader()
+    if loaded is None:
+        return None
+    value = convert(loaded)
+    cache.set(key, value, size=_size(value))
+    return value
+
+
+def read_many(cache: TTLCache, keys: list, loader: Callable[[list], Any], convert: Callable[[Any], Any]) -> dict:
+    """Cached values by id; all the misses are loaded with a single loader(missing) call."""
+    found = {}
+    missing = []
+    for key in keys:
+        value = cache.get(key)
+        if value is None:
+            missing.append(key)
+        else:
+            found[key] = value
+
+    if missing:
+        for loaded in loader(missing):
+            value = convert(loaded)
+            cache.set(value.id, value, size=_size(value))
+            found[value.id] = value
+    return found
+
+
+async def aread_many(cache: TTLCache, keys: list, loader, convert: Callable[[Any], Any]) -> dict:
+    found = {}
+    missing = []
+    for key in keys:
+        value = cache.get(key)
+        if value is None:
+            missing.append(key)
+        else:
+            found[key] = value
+
+    if missing:
+        for loaded in await loader(missing):
+            value = convert(loaded)
+            cache.set(value.id, value, size=_size(value))
+            found[value.id] = value
+    return found
+
+
+def invalidate_book(book_id: int | None = None):
+    if book_id is not None:
+        book_cache.delete(book_id)
+    list_cache.delete_where(lambda key, value: key[0] == "books")
+
+
+def invalidate_author(author_id: int | None = None):
+    if author_id is None:
+        list_cache.delete_where(lambda key, value: key[0] == "authors")
+        return
+    author_cache.delete(author_id)
+    # Los libros incrustan a su autor: se descartan los de ese autor y todos los listados
+    book_cache.delete_where(lambda key, book: book.author.id == author_id)
+    list_cache.clear()
+
+
+def clear():
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def stats() -> dict:
+    return {name: cache.stats() for name, cache in CACHES.items()}
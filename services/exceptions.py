@@ -6,3 +6,8 @@ class NotFoundError(Exception):
 class BadRequestError(Exception):
     """Raised when the input data is invalid or the request cannot be processed."""
     pass
+
+
+class ConflictError(Exception):
+    """Raised when the request conflicts with the current state of the resource."""
+    pass
@@ -0,0 +1,82 @@
+import base64
+import json
+import sys
+from typing import Optional
+from sqlalchemy import and_, or_
+from services.exceptions import BadRequestError
+
+
+def encode_cursor(position: dict) -> str:
+    """Builds an opaque cursor from the last row of a page."""
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor: str, sorts: tuple = ()) -> dict:
+    """Reads a cursor produced by encode_cursor; `sorts` lists the sort options it may carry."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        raise BadRequestError("Invalid cursor")
+
+    if not isinstance(position, dict) or not _is_int(position.get("id")):
+        raise BadRequestError("Invalid cursor")
+    # sort y value acaban en el ORDER BY y en parámetros SQL: solo valores que pudo generar encode_cursor
+    if "sort" in position and not (isinstance(position["sort"], str) and position["sort"] in sorts):
+        raise BadRequestError("Invalid cursor")
+    value = position.get("value")
+    if value is not None and not (_is_int(value) or isinstance(value, str)):
+        raise BadRequestError("Invalid cursor")
+    return position
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with `prefix` (for index-friendly prefix ranges).
+
+    None when there is no such string (the prefix is only U+10FFFF characters).
+    """
+    # U+10FFFF no tiene siguiente: se incrementa el carácter anterior
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    following = ord(stripped[-1]) + 1
+    # Los sustitutos (U+D800-U+DFFF) no se pueden enviar a SQLite como texto
+    if 0xD800 <= following <= 0xDFFF:
+        following = 0xE000
+    return stripped[:-1] + chr(following)
+
+
+def prefix_condition(column, prefix: str):
+    """`column LIKE 'prefix%'` as a range the index on `column` can serve."""
+    upper = prefix_upper_bound(prefix)
+    if upper is None:
+        return column >= prefix
+    return and_(column >= prefix, column < upper)
+
+
+def keyset_condition(id_column, last_id: int, sort_column=None, last_value=None, descending: bool = False):
+    """WHERE clause that seeks past (last_value, last_id) instead of using OFFSET.
+
+    Rows are expected to be ordered by (sort_column, id_column) in the same
+    direction. SQLite sorts NULLs first in ascending order and last in
+    descending order, so a nullable sort key is handled explicitly.
+    """
+    after_id = id_column < last_id if descending else id_column > last_id
+    if sort_column is None:
+        return after_id
+
+    if last_value is None:
+        if descending:
+            return and_(sort_column.is_(None), after_id)
+        return or_(sort_column.is_not(None), and_(sort_column.is_(None), after_id))
+
+    after_value = sort_column < last_value if descending else sort_column > last_value
+    condition = or_(after_value, and_(sort_column == last_value, after_id))
+    if descending:
+        condition = or_(condition, sort_column.is_(None))
+    return condition
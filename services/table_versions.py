@@ -0,0 +1,66 @@
+from sqlalchemy import column, event, select, table, text
+from db.db import Base
+
+# Versión por tabla para los ETag de los listados: un contador en table_versions
+# que unos triggers de SQLite incrementan en cada INSERT/UPDATE/DELETE, así que
+# cualquier escritura (servicios, importación masiva o SQL manual) cambia la
+# versión sin coordinación desde Python. Leerla es un SELECT sobre 2 filas.
+
+VERSIONS_TABLE = "table_versions"
+VERSIONED_TABLES = ("authors", "books")
+
+table_versions = table(VERSIONS_TABLE, column("name"), column("version"))
+
+
+def _statements():
+    yield f"""
+    CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """
+    for name in VERSIONED_TABLES:
+        yield f"INSERT OR IGNORE INTO {VERSIONS_TABLE}(name, version) VALUES ('{name}', 0)"
+        for suffix, operation in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+            yield f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_version_{suffix} AFTER {operation} ON {name} BEGIN
+                UPDATE {VERSIONS_TABLE} SET version = version + 1 WHERE name = '{name}';
+            END
+            """
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_table_versions(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in _statements():
+        connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_table_versions(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    connection.execute(text(f"DROP TABLE IF EXISTS {VERSIONS_TABLE}"))
+
+
+def versions_statement(*names: str):
+    return select(table_versions.c.name, table_versions.c.version).where(table_versions.c.name.in_(names))
+
+
+def versions_key(rows) -> str:
+    """Stable text like 'authors:3,books:12' for ETags and cache keys."""
+    return ",".join(f"{name}:{version}" for name, version in sorted(rows))
+
+
+def get_versions(db, *names: str) -> str:
+    if db.get_bind().dialect.name != "sqlite":
+        return ""
+    return versions_key(db.execute(versions_statement(*names)).all())
+
+
+async def get_versions_async(db, *names: str) -> str:
+    if db.get_bind().dialect.name != "sqlite":
+        return ""
+    result = await db.execute(versions_statement(*names))
+    return versions_key(result.all())
@@ -0,0 +1,32 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.user_model import User
+from schemas.user_schema import UserCreate
+from core.security import get_password_hash_async, verify_password_async, HashingPoolSaturated
+from core.auth import create_access_token, token_claims
+from fastapi import HTTPException
+from services.user.user_services import hashing_busy_error
+
+async def register_user(db: AsyncSession, data: UserCreate):
+    existing = await db.scalar(select(User).where(User.username == data.username))
+    if existing:
+        raise HTTPException(status_code=400, detail="Username already taken")
+    try:
+        hashed_password = await get_password_hash_async(data.password)
+    except HashingPoolSaturated:
+        raise hashing_busy_error()
+    new_user = User(username=data.username, password=hashed_password)
+    db.add(new_user)
+    await db.commit()
+    return new_user
+
+async def login_user(db: AsyncSession, username: str, password: str):
+    user = await db.scalar(select(User).where(User.username == username))
+    try:
+        valid = user is not None and await verify_password_async(password, user.password)
+    except HashingPoolSaturated:
+        raise hashing_busy_error()
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    token = create_access_token(token_claims(user))
+    return {"access_token": token, "token_type": "bearer"}
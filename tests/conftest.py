@@ -1,8 +1,12 @@
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
-from db.db import Base, get_db
+from db.db import Base, get_db, get_read_db
+from core.auth import token_cache, token_denylist, token_versions
+from core.metrics import instrument_engine
+from services import cache as response_cache
 from app import app
 
 # Importar todos los modelos para que se registren en Base
@@ -14,9 +18,10 @@ from models.user_model import User
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_engine(engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 @pytest.fixture(scope="function")
@@ -41,9 +46,18 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    token_cache.clear()
+    token_denylist.clear()
+    token_versions.clear()
+    response_cache.clear()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+    token_cache.clear()
+    token_denylist.clear()
+    token_versions.clear()
+    response_cache.clear()
 
 
 @pytest.fixture
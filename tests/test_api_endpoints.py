@@ -1,5 +1,9 @@
+import csv
+import io
+import json
 import pytest
 from fastapi.testclient import TestClient
+from core import fast_json
 from models.author_model import Author
 from models.book_model import Book
 from tests.conftest import client, test_user_token, db_session
@@ -35,6 +39,16 @@ class TestAuthorEndpoints:
         assert data["nationality"] == "Colombiana"
         assert "id" in data
     
+    def test_create_author_matches_get(self, client: TestClient, test_user_token: str):
+        """Test: POST y GET /api/authors/{id} serializan igual el mismo autor (fechas incluidas)"""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        created = client.post("/api/authors/", json={"name": "Isabel Allende"}, headers=headers).json()
+
+        fetched = client.get(f"/api/authors/{created['id']}", headers=headers).json()
+
+        assert created == fetched
+        assert not created["created_at"].endswith("Z")
+    
     def test_create_author_without_auth(self, client: TestClient):
         """Test: POST /api/authors/ sin autenticación debe fallar"""
         author_data = {"name": "Test Author"}
@@ -88,6 +102,69 @@ class TestAuthorEndpoints:
         assert data["name"] == "Updated Name"
         assert data["nationality"] == "Updated"
     
+    def test_get_authors_projection_and_cursor(self, client: TestClient, test_user_token: str, db_session):
+        """Test: GET /api/authors/ con fields= y paginación por cursor"""
+        db_session.add_all([Author(name="Autor A", nationality="Chilena"), Author(name="Autor B", nationality="Chilena")])
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        response = client.get("/api/authors/?fields=name&nationality=Chilena&pagination=cursor&limit=1", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"] == [{"id": 1, "name": "Autor A"}]
+        
+        response = client.get(f"/api/authors/?fields=name&cursor={data['next_cursor']}&limit=1", headers=headers)
+        assert response.json() == {"items": [{"id": 2, "name": "Autor B"}], "next_cursor": None}
+        
+        response = client.get("/api/authors/?fields=secreto", headers=headers)
+        assert response.status_code == 400
+    
+    def test_export_authors(self, client: TestClient, test_user_token: str, db_session):
+        """Test: GET /api/authors/export devuelve una fila por autor"""
+        db_session.add_all([Author(name="Autor A"), Author(name="Autor B", nationality="Chilena")])
+        db_session.commit()
+        
+        response = client.get(
+            "/api/authors/export?format=csv",
+            headers={"Authorization": f"Bearer {test_user_token}"}
+        )
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["name"] for row in rows] == ["Autor A", "Autor B"]
+        assert rows[0]["nationality"] == ""
+    
+    def test_get_author_conditional(self, client: TestClient, test_user_token: str, db_session):
+        """Test: GET /api/authors/{id} y el listado responden 304 con If-None-Match"""
+        author = Author(name="Autor ETag", nationality="Chilena")
+        db_session.add(author)
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        for url in (f"/api/authors/{author.id}", "/api/authors/?limit=5"):
+            response = client.get(url, headers=headers)
+            etag = response.headers["etag"]
+            assert response.headers["cache-control"] == "private, no-cache"
+            
+            response = client.get(url, headers={**headers, "If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+        
+        client.put(f"/api/authors/{author.id}", json={"name": "Autor Nuevo"}, headers=headers)
+        response = client.get("/api/authors/?limit=5", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[0]["name"] == "Autor Nuevo"
+    
+    def test_get_authors_batch(self, client: TestClient, test_user_token: str, db_session):
+        """Test: GET /api/authors/batch resuelve varios ids en una petición"""
+        db_session.add_all([Author(name="Autor A"), Author(name="Autor B")])
+        db_session.commit()
+        
+        response = client.get("/api/authors/batch?ids=2,5,1", headers={"Authorization": f"Bearer {test_user_token}"})
+        assert response.status_code == 200
+        assert [author["name"] for author in response.json()["items"]] == ["Autor B", "Autor A"]
+        assert response.json()["missing"] == [5]
+    
     def test_delete_author_success(self, client: TestClient, test_user_token: str, db_session):
         """Test: DELETE /api/authors/{id} eliminar autor exitosamente"""
         author = Author(name="To Delete", nationality="Test")
@@ -219,6 +296,211 @@ class TestBookEndpoints:
         books = response.json()
         assert len(books) == 1
     
+    def test_get_books_cursor_pagination(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: GET /api/books/ en modo cursor devuelve next_cursor"""
+        for i in range(3):
+            db_session.add(Book(title=f"Book {i}", isbn=f"isbn-{i}", author_id=test_author.id))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        response = client.get("/api/books/?pagination=cursor&limit=2", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert [b["title"] for b in data["items"]] == ["Book 0", "Book 1"]
+        assert data["next_cursor"]
+        
+        response = client.get(f"/api/books/?cursor={data['next_cursor']}&limit=2", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert [b["title"] for b in data["items"]] == ["Book 2"]
+        assert data["next_cursor"] is None
+        
+        response = client.get("/api/books/?cursor=invalido", headers=headers)
+        assert response.status_code == 400
+    
+    def test_get_books_limit_bounds(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: limit fuera de rango se rechaza con 422 en lugar de fallar con 500"""
+        db_session.add(Book(title="Book", isbn="isbn", author_id=test_author.id))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        for query in ("pagination=cursor&limit=0", "pagination=cursor&limit=-1", "limit=-1", "limit=100000"):
+            response = client.get(f"/api/books/?{query}", headers=headers)
+            assert response.status_code == 422, query
+    
+    def test_get_books_normalized_view(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: GET /api/books/?view=normalized no repite el autor en cada libro"""
+        for i in range(3):
+            db_session.add(Book(title=f"Libro {i}", isbn=f"isbn-{i}", author_id=test_author.id))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        response = client.get("/api/books/?view=normalized", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert [book["author_id"] for book in data["books"]] == [test_author.id] * 3
+        assert "author" not in data["books"][0]
+        assert list(data["authors"]) == [str(test_author.id)]
+        assert data["authors"][str(test_author.id)]["name"] == test_author.name
+        
+        response = client.get("/api/books/?view=normalized&pagination=cursor&limit=2", headers=headers)
+        assert len(response.json()["books"]) == 2
+        assert response.json()["next_cursor"]
+    
+    def test_get_books_fast_json(self, client: TestClient, test_user_token: str, test_author: Author, db_session, monkeypatch):
+        """Test: Con FAST_JSON los listados devuelven el mismo JSON que por response_model"""
+        for i in range(3):
+            db_session.add(Book(title=f"Libro {i}", isbn=f"isbn-{i}", author_id=test_author.id))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        urls = [
+            "/api/books/?limit=3", "/api/books/?pagination=cursor&limit=2", "/api/books/?view=normalized",
+            "/api/authors/", "/api/authors/?fields=name",
+        ]
+        
+        expected = [client.get(url, headers=headers).json() for url in urls]
+        monkeypatch.setattr(fast_json, "FAST_JSON", True)
+        responses = [client.get(url, headers=headers) for url in urls]
+        
+        assert [response.status_code for response in responses] == [200] * len(urls)
+        assert all(response.headers["content-type"] == "application/json" for response in responses)
+        assert [response.json() for response in responses] == expected
+        assert len(expected[0]) == 3
+    
+    def test_get_books_filters_and_sort(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: Filtros por género, autor, años e ISBN con sort y paginación por cursor"""
+        other = Author(name="Otro Autor")
+        db_session.add(other)
+        db_session.commit()
+        years = [1990, 2005, None, 2010, 2005, 1980]
+        for i, year in enumerate(years):
+            db_session.add(Book(
+                title=f"Libro {i}", isbn=f"978-{i}", author_id=test_author.id if i < 5 else other.id,
+                genre="Novela" if i % 2 == 0 else "Ensayo", published_year=year,
+            ))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        def titles(url):
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200
+            return [book["title"] for book in response.json()]
+        
+        assert titles("/api/books/?genre=Novela") == ["Libro 0", "Libro 2", "Libro 4"]
+        assert titles(f"/api/books/?authorId={other.id}") == ["Libro 5"]
+        assert titles("/api/books/?yearFrom=2000&yearTo=2006") == ["Libro 1", "Libro 4"]
+        assert titles("/api/books/?isbnPrefix=978-3") == ["Libro 3"]
+        assert titles("/api/books/?isbnPrefix=978-3%F4%8F%BF%BF") == []
+        assert titles("/api/books/?sort=-published_year&genre=Novela") == ["Libro 4", "Libro 0", "Libro 2"]
+        
+        # Con cursor el orden viaja en el cursor y las páginas no repiten ni saltan filas
+        seen = []
+        url = "/api/books/?pagination=cursor&sort=published_year&limit=2"
+        while url:
+            data = client.get(url, headers=headers).json()
+            seen.extend(book["title"] for book in data["items"])
+            url = f"/api/books/?cursor={data['next_cursor']}&limit=2" if data["next_cursor"] else None
+        assert seen == ["Libro 2", "Libro 5", "Libro 0", "Libro 1", "Libro 4", "Libro 3"]
+        
+        first = client.get("/api/books/?pagination=cursor&sort=published_year&limit=2", headers=headers).json()
+        response = client.get(f"/api/books/?cursor={first['next_cursor']}&sort=isbn", headers=headers)
+        assert response.status_code == 400
+        assert client.get("/api/books/?sort=title", headers=headers).status_code == 422
+    
+    def test_get_books_stats_and_total_count(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: GET /api/books/stats y X-Total-Count con los mismos filtros del listado"""
+        for i in range(4):
+            db_session.add(Book(title=f"Libro {i}", isbn=f"isbn-{i}", author_id=test_author.id, genre="Novela" if i else "Ensayo"))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        response = client.get("/api/books/stats", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 4
+        assert data["by_genre"] == [{"value": "Novela", "count": 3}, {"value": "Ensayo", "count": 1}]
+        assert data["by_author"] == [{"author_id": test_author.id, "name": test_author.name, "count": 4}]
+        assert client.get("/api/books/stats", headers={**headers, "If-None-Match": response.headers["etag"]}).status_code == 304
+        
+        response = client.get("/api/books/?genre=Novela&limit=1&count=true", headers=headers)
+        assert response.headers["x-total-count"] == "3"
+        assert len(response.json()) == 1
+        assert "x-total-count" not in client.get("/api/books/", headers=headers).headers
+        
+        client.delete("/api/books/2", headers=headers)
+        assert client.get("/api/books/stats", headers=headers).json()["total"] == 3
+    
+    def test_get_books_batch(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: GET /api/books/batch devuelve los libros en el orden pedido y los ids que faltan"""
+        for i in range(3):
+            db_session.add(Book(title=f"Libro {i}", isbn=f"isbn-{i}", author_id=test_author.id))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        response = client.get("/api/books/batch?ids=3,99,1,3", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert [book["id"] for book in data["items"]] == [3, 1]
+        assert data["items"][0]["author"]["name"] == test_author.name
+        assert data["missing"] == [99]
+        
+        assert client.get("/api/books/batch?ids=1,x", headers=headers).status_code == 400
+        assert client.get("/api/books/batch?ids=", headers=headers).status_code == 400
+        # Fuera del rango de INTEGER de SQLite o no positivos: 400, no OverflowError al enlazar el parámetro
+        for ids in ("99999999999999999999999", "9223372036854775808", "0", "-1"):
+            assert client.get(f"/api/books/batch?ids={ids}", headers=headers).status_code == 400, ids
+        assert client.get("/api/books/batch?ids=9223372036854775807", headers=headers).json()["missing"] == [2 ** 63 - 1]
+    
+    def test_bulk_create_books_json_and_ndjson(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: POST /api/books/bulk acepta arrays JSON y NDJSON"""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        rows = [{"title": f"Book {i}", "isbn": f"isbn-{i}", "author_id": test_author.id} for i in range(3)]
+        
+        response = client.post("/api/books/bulk", json=rows, headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"created": 3, "failed": 0, "errors": []}
+        
+        lines = [
+            '{"title": "Book 3", "isbn": "isbn-3", "author_id": %d}' % test_author.id,
+            '{"title": "Book 0", "isbn": "isbn-0", "author_id": %d}' % test_author.id,
+            "",
+            '{"title": "Book 4", "isbn": "isbn-4", "author_id": %d}' % test_author.id,
+        ]
+        response = client.post(
+            "/api/books/bulk?chunk_size=2",
+            content="\n".join(lines).encode(),
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert data["errors"] == [{"index": 1, "isbn": "isbn-0", "detail": "A book with this ISBN already exists"}]
+        assert db_session.query(Book).count() == 5
+        
+        response = client.post("/api/books/bulk", json={"title": "no es una lista"}, headers=headers)
+        assert response.status_code == 400
+    
+    def test_export_books_ndjson_and_csv(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: GET /api/books/export en NDJSON y CSV"""
+        for i in range(3):
+            db_session.add(Book(title=f"Book {i}", isbn=f"isbn-{i}", author_id=test_author.id))
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        response = client.get("/api/books/export", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["isbn"] for row in rows] == ["isbn-0", "isbn-1", "isbn-2"]
+        assert rows[0]["author_name"] == "Test Author"
+        
+        response = client.get("/api/books/export?format=csv", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 3
+        assert rows[2]["title"] == "Book 2"
+    
     def test_update_book_success(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
         """Test: PUT /api/books/{id} actualizar libro exitosamente"""
         book = Book(title="Original Title", isbn="123", author_id=test_author.id)
@@ -240,6 +522,48 @@ class TestBookEndpoints:
         assert data["title"] == "Updated Title"
         assert data["genre"] == "New Genre"
     
+    def test_get_book_conditional(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: el ETag de un libro cambia al actualizarlo y un ETag viejo no da 304"""
+        book = Book(title="Libro ETag", isbn="etag-1", author_id=test_author.id)
+        db_session.add(book)
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        url = f"/api/books/{book.id}"
+        
+        etag = client.get(url, headers=headers).headers["etag"]
+        assert client.get(url, headers={**headers, "If-None-Match": f'W/{etag}, "otro"'}).status_code == 304
+        list_etag = client.get("/api/books/", headers=headers).headers["etag"]
+        assert client.get("/api/books/", headers={**headers, "If-None-Match": list_etag}).status_code == 304
+        # Otra query string es otro recurso
+        assert client.get("/api/books/?limit=1", headers={**headers, "If-None-Match": list_etag}).status_code == 200
+        
+        client.put(url, json={"title": "Libro Editado"}, headers=headers)
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["title"] == "Libro Editado"
+        assert client.get("/api/books/", headers={**headers, "If-None-Match": list_etag}).status_code == 200
+    
+    def test_checkout_and_return_book(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
+        """Test: POST /api/books/{id}/checkout y /return, con 409 si el libro ya está en ese estado"""
+        book = Book(title="Prestable", isbn="loan-1", author_id=test_author.id)
+        db_session.add(book)
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        
+        response = client.post(f"/api/books/{book.id}/checkout", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["is_available"] is False
+        assert client.get(f"/api/books/{book.id}", headers=headers).json()["is_available"] is False
+        
+        response = client.post(f"/api/books/{book.id}/checkout", headers=headers)
+        assert response.status_code == 409
+        assert response.json()["detail"] == "Book is already checked out"
+        
+        assert client.post(f"/api/books/{book.id}/return", headers=headers).json()["is_available"] is True
+        assert client.post(f"/api/books/{book.id}/return", headers=headers).status_code == 409
+        assert client.post("/api/books/999/checkout", headers=headers).status_code == 404
+    
     def test_delete_book_success(self, client: TestClient, test_user_token: str, test_author: Author, db_session):
         """Test: DELETE /api/books/{id} eliminar libro exitosamente"""
         book = Book(title="To Delete", isbn="123", author_id=test_author.id)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from db.db import Base, get_async_db, get_async_read_db
+from routes.async_author_router import router as async_author_router
+from routes.async_book_router import router as async_book_router
+from routes.async_user_router import router as async_user_router
+from services.authors import async_author_services
+from services.books import async_book_services
+from services.exceptions import NotFoundError, BadRequestError
+from schemas.author_schema import CreateAuthorSchema
+from schemas.book_schema import CreateBookSchema, UpdateBookSchema
+
+
+@pytest.fixture(scope="function")
+def async_sessionmaker_fixture():
+    """Crea una base de datos async en memoria para cada test"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+class TestAsyncServices:
+    """Tests de los servicios async (AsyncSession + aiosqlite)"""
+
+    def test_book_crud(self, async_sessionmaker_fixture):
+        """Test: Crear, listar, actualizar y eliminar libros en modo async"""
+        async def scenario():
+            async with async_sessionmaker_fixture() as db:
+                author = await async_author_services.create_author(db, CreateAuthorSchema(name="Julio Cortázar"))
+                book = await async_book_services.create_book(
+                    db, CreateBookSchema(title="Rayuela", isbn="111", author_id=author.id)
+                )
+                assert book.id is not None
+                assert book.author.name == "Julio Cortázar"
+
+                with pytest.raises(BadRequestError, match="ISBN already exists"):
+                    await async_book_services.create_book(
+                        db, CreateBookSchema(title="Otro", isbn="111", author_id=author.id)
+                    )
+
+                page = await async_book_services.get_books_keyset(db, limit=1)
+                assert [b.title for b in page["items"]] == ["Rayuela"]
+
+                found = await async_book_services.get_books(db, search="rayu")
+                assert [b.id for b in found] == [book.id]
+
+                updated = await async_book_services.update_book(db, book.id, UpdateBookSchema(isAvailable=False))
+                assert updated.is_available is False
+
+                with pytest.raises(BadRequestError, match="books are associated"):
+                    await async_author_services.delete_author(db, author.id)
+
+                await async_book_services.delete_book(db, book.id)
+                assert await async_book_services.get_book_by_id(db, book.id) is None
+
+                with pytest.raises(NotFoundError):
+                    await async_book_services.delete_book(db, book.id)
+
+        asyncio.run(scenario())
+
+    def test_async_endpoints(self, async_sessionmaker_fixture):
+        """Test: Los routers async sirven las mismas rutas que los sync"""
+        app = FastAPI()
+        app.include_router(async_author_router, prefix="/api")
+        app.include_router(async_book_router, prefix="/api")
+        app.include_router(async_user_router, prefix="/api")
+
+        async def override_get_async_db():
+            async with async_sessionmaker_fixture() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        app.dependency_overrides[get_async_read_db] = override_get_async_db
+        with TestClient(app) as client:
+            user_data = {"username": "asyncuser", "password": "testpass123"}
+            assert client.post("/api/users/register", json=user_data).status_code == 200
+            token = client.post("/api/users/login", json=user_data).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            author = client.post("/api/authors/", json={"name": "Borges"}, headers=headers).json()
+            assert client.get(f"/api/authors/{author['id']}", headers=headers).json() == author
+            response = client.post(
+                "/api/books/", json={"title": "Ficciones", "isbn": "222", "author_id": author["id"]}, headers=headers
+            )
+            assert response.status_code == 201
+            assert response.json()["author"]["name"] == "Borges"
+
+            response = client.get("/api/books/", headers=headers)
+            assert response.status_code == 200
+            assert [b["title"] for b in response.json()] == ["Ficciones"]
+
+            response = client.get(f"/api/books/?authorId={author['id']}&sort=-isbn&pagination=cursor", headers=headers)
+            assert [b["title"] for b in response.json()["items"]] == ["Ficciones"]
+
+            response = client.get(f"/api/books/batch?ids=999,{response.json()['items'][0]['id']}", headers=headers)
+            assert [b["title"] for b in response.json()["items"]] == ["Ficciones"]
+            assert response.json()["missing"] == [999]
+            assert client.get(f"/api/authors/batch?ids={author['id']}", headers=headers).json()["items"][0]["name"] == "Borges"
+
+            response = client.get("/api/books/stats", headers=headers)
+            assert response.json()["by_author"] == [{"author_id": author["id"], "name": "Borges", "count": 1}]
+            assert client.get("/api/books/?count=true", headers=headers).headers["x-total-count"] == "1"
+
+            response = client.get("/api/books/export", headers=headers)
+            assert response.status_code == 200
+            assert [json.loads(line)["author_name"] for line in response.text.splitlines()] == ["Borges"]
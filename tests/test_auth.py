@@ -0,0 +1,197 @@
+import asyncio
+import time
+from datetime import timedelta
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from jose import jwt
+from sqlalchemy.orm import Session
+from core import auth
+from core.auth import token_cache, create_access_token
+from core.cache import TTLCache
+from core.security import hashing_pool
+from models.user_model import User
+from app import app
+
+
+class TestTTLCache:
+    """Tests unitarios de la caché LRU con TTL"""
+
+    def test_lru_eviction(self):
+        """Test: Al superar maxsize se descarta la entrada menos usada"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Test: Las entradas caducan según su TTL"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_disabled_cache(self):
+        """Test: maxsize=0 desactiva la caché"""
+        cache = TTLCache(maxsize=0, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+
+class TestTokenCache:
+    """Tests de la caché de tokens validados en get_current_user"""
+
+    def test_repeated_requests_hit_cache(self, client: TestClient, test_user_token: str):
+        """Test: Peticiones repetidas con el mismo token no vuelven a consultar el usuario"""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        client.get("/api/users/profile", headers=headers)
+        before = token_cache.stats()
+
+        response = client.get("/api/users/profile", headers=headers)
+
+        assert response.status_code == 200
+        assert token_cache.stats()["hits"] == before["hits"] + 1
+        assert token_cache.stats()["misses"] == before["misses"]
+
+    def test_user_update_invalidates_cache(self, client: TestClient, test_user_token: str, db_session: Session):
+        """Test: Modificar el usuario invalida sus tokens cacheados"""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        client.get("/api/users/profile", headers=headers)
+        assert token_cache.stats()["size"] == 1
+
+        user = db_session.query(User).filter(User.username == "testuser").first()
+        db_session.delete(user)
+        db_session.commit()
+
+        assert token_cache.stats()["size"] == 0
+        response = client.get("/api/users/profile", headers=headers)
+        assert response.status_code == 401
+
+    def test_cache_entry_capped_at_token_exp(self, client: TestClient, test_user_token: str):
+        """Test: Un token a punto de expirar no queda en caché más allá de su exp"""
+        token = create_access_token({"sub": "testuser"}, expires_delta=timedelta(seconds=-1))
+
+        response = client.get("/api/users/profile", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 401
+        assert token_cache.stats()["size"] == 0
+
+    def test_auth_cache_stats_endpoint(self, client: TestClient, test_user_token: str):
+        """Test: GET /api/users/auth-cache/stats expone los contadores"""
+        response = client.get("/api/users/auth-cache/stats", headers={"Authorization": f"Bearer {test_user_token}"})
+        assert response.status_code == 200
+        assert {"hits", "misses", "size", "hit_ratio"} <= set(response.json())
+
+
+class TestStatelessTokens:
+    """Tests del modo AUTH_STATELESS y la revocación en memoria"""
+
+    def login(self, client: TestClient) -> str:
+        user_data = {"username": "stateless", "password": "testpass123"}
+        client.post("/api/users/register", json=user_data)
+        return client.post("/api/users/login", json=user_data).json()["access_token"]
+
+    def test_claims_and_no_queries(self, client: TestClient, monkeypatch):
+        """Test: El token lleva uid, ver y jti y autenticar no consulta la base"""
+        monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+        token = self.login(client)
+        claims = jwt.get_unverified_claims(token)
+        assert claims["sub"] == "stateless"
+        assert {"uid", "ver", "jti"} <= set(claims)
+
+        misses = token_cache.stats()["misses"]
+        response = client.get("/api/users/profile", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert token_cache.stats()["misses"] == misses + 1
+        assert '"0 queries"' in response.headers["server-timing"]
+
+    def test_user_change_bumps_version(self, client: TestClient, db_session: Session, monkeypatch):
+        """Test: Borrar o modificar el usuario revoca sus tokens sin estado"""
+        monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+        headers = {"Authorization": f"Bearer {self.login(client)}"}
+        assert client.get("/api/users/profile", headers=headers).status_code == 200
+
+        db_session.delete(db_session.query(User).filter(User.username == "stateless").first())
+        db_session.commit()
+
+        response = client.get("/api/users/profile", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token has been revoked"
+
+    def test_logout_revokes_token(self, client: TestClient, test_user_token: str):
+        """Test: Tras el logout el token deja de valer, también desde la caché"""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        assert client.get("/api/users/profile", headers=headers).status_code == 200
+
+        assert client.post("/api/users/logout", headers=headers).status_code == 200
+
+        response = client.get("/api/users/profile", headers=headers)
+        assert response.status_code == 401
+        assert len(auth.token_denylist) == 1
+
+
+class TestHashingPool:
+    """Tests del pool dedicado para bcrypt"""
+
+    def test_login_runs_on_hashing_pool(self, client: TestClient, test_user_token: str):
+        """Test: Login y registro pasan por el pool y actualizan sus métricas"""
+        stats = hashing_pool.stats()
+        assert stats["completed"] >= 2
+        assert stats["queue_depth"] == 0
+
+    def test_register_keeps_event_loop_free(self, client: TestClient, db_session: Session):
+        """Test: Registro y login (sesión síncrona) se ejecutan fuera del event loop"""
+        bind = db_session.get_bind()
+
+        def slow_statement(*args):
+            time.sleep(0.05)
+
+        async def scenario():
+            lag = 0.0
+
+            async def heartbeat(stop: asyncio.Event):
+                nonlocal lag
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    await asyncio.sleep(0.005)
+                    lag = max(lag, time.perf_counter() - start - 0.005)
+
+            stop = asyncio.Event()
+            ticker = asyncio.create_task(heartbeat(stop))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+                user_data = {"username": "loopuser", "password": "testpass123"}
+                assert (await async_client.post("/api/users/register", json=user_data)).status_code == 200
+                assert (await async_client.post("/api/users/login", json=user_data)).status_code == 200
+            stop.set()
+            await ticker
+            return lag
+
+        # Cada sentencia SQL tarda 50 ms: en el event loop lo bloquearía entero
+        event.listen(bind, "before_cursor_execute", slow_statement)
+        try:
+            lag = asyncio.run(scenario())
+        finally:
+            event.remove(bind, "before_cursor_execute", slow_statement)
+
+        assert lag < 0.04
+
+    def test_saturated_pool_returns_503(self, client: TestClient, monkeypatch):
+        """Test: Con el pool saturado el login responde 503 de inmediato"""
+        monkeypatch.setattr(hashing_pool, "max_pending", 0)
+        rejected = hashing_pool.stats()["rejected"]
+
+        response = client.post("/api/users/register", json={"username": "busy", "password": "secret"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert hashing_pool.stats()["rejected"] == rejected + 1
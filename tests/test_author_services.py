@@ -4,6 +4,7 @@ from services.authors import author_services
 from services.exceptions import NotFoundError, BadRequestError
 from schemas.author_schema import CreateAuthorSchema, UpdateAuthorSchema
 from models.author_model import Author
+from core import metrics
 from tests.conftest import db_session
 
 
@@ -55,6 +56,52 @@ class TestAuthorServices:
         assert authors[0].name == "Autor 1"
         assert authors[1].name == "Autor 2"
     
+    def test_get_authors_paginated_and_filtered(self, db_session: Session):
+        """Test: Listado de autores paginado y filtrado por nacionalidad y prefijo"""
+        db_session.add_all([
+            Author(name="Borges", nationality="Argentina"),
+            Author(name="Bioy Casares", nationality="Argentina"),
+            Author(name="Bolaño", nationality="Chilena"),
+            Author(name="Cortázar", nationality="Argentina"),
+        ])
+        db_session.commit()
+        
+        assert [a.name for a in author_services.get_authors(db_session, page=2, limit=3)] == ["Cortázar"]
+        assert [a.name for a in author_services.get_authors(db_session, nationality="Argentina", name_prefix="B")] == ["Borges", "Bioy Casares"]
+        assert [a.name for a in author_services.get_authors(db_session, name_prefix="Bo")] == ["Borges", "Bolaño"]
+    
+    def test_get_authors_prefix_last_code_point(self, db_session: Session):
+        """Test: Un prefijo que termina en U+10FFFF filtra bien en lugar de fallar"""
+        db_session.add_all([
+            Author(name="a\U0010FFFF"),
+            Author(name="a\U0010FFFFz"),
+            Author(name="b"),
+            Author(name="\U0010FFFF\U0010FFFF"),
+        ])
+        db_session.commit()
+        
+        assert [a.name for a in author_services.get_authors(db_session, name_prefix="a\U0010FFFF")] == ["a\U0010FFFF", "a\U0010FFFFz"]
+        assert [a.name for a in author_services.get_authors(db_session, name_prefix="\U0010FFFF")] == ["\U0010FFFF\U0010FFFF"]
+    
+    def test_get_authors_keyset_with_projection(self, db_session: Session):
+        """Test: Paginación por cursor devolviendo solo los campos pedidos"""
+        for i in range(3):
+            db_session.add(Author(name=f"Autor {i}"))
+        db_session.commit()
+        fields = author_services.parse_fields("name")
+        
+        page1 = author_services.get_authors_keyset(db_session, limit=2, fields=fields)
+        page2 = author_services.get_authors_keyset(db_session, limit=2, cursor=page1["next_cursor"], fields=fields)
+        
+        assert page1["items"] == [{"id": 1, "name": "Autor 0"}, {"id": 2, "name": "Autor 1"}]
+        assert page2["items"] == [{"id": 3, "name": "Autor 2"}]
+        assert page2["next_cursor"] is None
+    
+    def test_parse_fields_unknown(self):
+        """Test: Un campo desconocido en la proyección debe fallar"""
+        with pytest.raises(BadRequestError, match="Unknown fields: password"):
+            author_services.parse_fields("id,password")
+    
     def test_get_author_by_id_success(self, db_session: Session):
         """Test: Obtener autor por ID exitosamente"""
         author = Author(name="Test Author", nationality="Test Nationality")
@@ -126,6 +173,17 @@ class TestAuthorServices:
         found = db_session.query(Author).filter(Author.id == author_id).first()
         assert found is None
     
+    def test_delete_author_single_statement(self, db_session: Session):
+        """Test: Borrar un autor sin libros es un solo DELETE con el EXISTS incluido"""
+        author = Author(name="To Delete", nationality="Test")
+        db_session.add(author)
+        db_session.commit()
+        db_session.expunge_all()
+
+        with metrics.collect() as stats:
+            author_services.delete_author(db_session, author.id)
+        assert stats.queries == 1
+
     def test_delete_author_not_found(self, db_session: Session):
         """Test: Eliminar autor inexistente debe fallar"""
         with pytest.raises(NotFoundError, match="Author not found"):
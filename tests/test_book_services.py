@@ -1,8 +1,15 @@
+import threading
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from db.db import Base
+from db.sqlite_tuning import sqlite_pragmas, configure_sqlite
 from services.books import book_services
-from services.exceptions import NotFoundError, BadRequestError
-from schemas.book_schema import CreateBookSchema, UpdateBookSchema
+from services.exceptions import NotFoundError, BadRequestError, ConflictError
+from schemas.book_schema import CreateBookSchema, UpdateBookSchema, BookOut
+from core import metrics
+from services import cache as response_cache
+from services.pagination import encode_cursor
 from models.book_model import Book
 from models.author_model import Author
 from tests.conftest import db_session
@@ -135,6 +142,315 @@ class TestBookServices:
         assert len(filtered_books) == 1
         assert filtered_books[0].title == "Cien años de soledad"
     
+    def test_get_books_keyset_pagination(self, db_session: Session, test_author: Author):
+        """Test: Paginar libros con cursor (keyset)"""
+        for i in range(15):
+            db_session.add(Book(title=f"Book {i}", isbn=f"123456789{i:02d}", author_id=test_author.id))
+        db_session.commit()
+        
+        page1 = book_services.get_books_keyset(db_session, limit=10)
+        assert len(page1["items"]) == 10
+        assert page1["next_cursor"] is not None
+        
+        page2 = book_services.get_books_keyset(db_session, limit=10, cursor=page1["next_cursor"])
+        assert len(page2["items"]) == 5
+        assert page2["next_cursor"] is None
+        
+        ids = [book.id for book in page1["items"] + page2["items"]]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == 15
+    
+    def test_get_books_keyset_with_filter(self, db_session: Session, test_author: Author):
+        """Test: Paginación con cursor respeta los filtros"""
+        for i in range(6):
+            db_session.add(Book(title=f"Book {i}", isbn=f"isbn-{i}", author_id=test_author.id, is_available=i % 2 == 0))
+        db_session.commit()
+        
+        page1 = book_services.get_books_keyset(db_session, limit=2, isAvailable=True)
+        page2 = book_services.get_books_keyset(db_session, limit=2, isAvailable=True, cursor=page1["next_cursor"])
+        
+        assert [b.title for b in page1["items"]] == ["Book 0", "Book 2"]
+        assert [b.title for b in page2["items"]] == ["Book 4"]
+        assert page2["next_cursor"] is None
+    
+    def test_get_books_keyset_invalid_cursor(self, db_session: Session):
+        """Test: Un cursor inválido debe fallar"""
+        with pytest.raises(BadRequestError, match="Invalid cursor"):
+            book_services.get_books_keyset(db_session, cursor="no-es-un-cursor")
+    
+    @pytest.mark.parametrize("position", [
+        {"id": 1, "sort": 5},
+        {"id": 1, "sort": ["isbn"]},
+        {"id": 1, "sort": "title"},
+        {"id": 1, "sort": "isbn", "value": {"a": 1}},
+        {"id": 1, "sort": "published_year", "value": [2000]},
+        {"id": True},
+    ])
+    def test_get_books_keyset_tampered_cursor(self, db_session: Session, position: dict):
+        """Test: Un cursor manipulado (sort o value de otro tipo) falla con 400, no con 500"""
+        with pytest.raises(BadRequestError, match="Invalid cursor"):
+            book_services.get_books_keyset(db_session, cursor=encode_cursor(position))
+    
+    def test_search_books_ranked_prefix(self, db_session: Session, test_author: Author):
+        """Test: Búsqueda de texto completo por prefijo y ordenada por relevancia"""
+        db_session.add(Book(title="Historia de la soledad", isbn="111", author_id=test_author.id, genre="Soledad"))
+        db_session.add(Book(title="Cien años de soledad", isbn="222", author_id=test_author.id, genre="Novela"))
+        db_session.add(Book(title="El amor en los tiempos del cólera", isbn="333", author_id=test_author.id))
+        db_session.commit()
+        
+        books = book_services.get_books(db_session, search="soled")
+        
+        assert len(books) == 2
+        # El libro que coincide en título y género aparece primero
+        assert books[0].title == "Historia de la soledad"
+        
+        # Sin distinguir acentos
+        assert [b.title for b in book_services.get_books(db_session, search="colera")] == ["El amor en los tiempos del cólera"]
+    
+    def test_search_books_by_author_name(self, db_session: Session, test_author: Author):
+        """Test: La búsqueda incluye el nombre del autor y se sincroniza al escribir"""
+        book = book_services.create_book(db_session, CreateBookSchema(title="Rayuela", isbn="111", author_id=test_author.id))
+        
+        assert [b.id for b in book_services.get_books(db_session, search="test auth")] == [book.id]
+        
+        book_services.update_book(db_session, book.id, UpdateBookSchema(title="Final del juego"))
+        assert book_services.get_books(db_session, search="rayuela") == []
+        assert [b.id for b in book_services.get_books(db_session, search="juego")] == [book.id]
+        
+        book_services.delete_book(db_session, book.id)
+        assert book_services.get_books(db_session, search="juego") == []
+    
+    def test_get_books_normalized(self, db_session: Session, test_author: Author):
+        """Test: La vista normalizada devuelve author_id y cada autor una sola vez, en 2 queries"""
+        other = Author(name="Otro autor")
+        db_session.add(other)
+        db_session.commit()
+        for i in range(6):
+            author_id = test_author.id if i % 3 else other.id
+            db_session.add(Book(title=f"Libro {i}", isbn=f"isbn-{i}", author_id=author_id))
+        db_session.commit()
+        db_session.expunge_all()
+
+        with metrics.collect() as stats:
+            result = book_services.get_books_cached(db_session, limit=10, normalized=True)
+        assert stats.queries == 2
+
+        assert [book.author_id for book in result["books"]] == [other.id, test_author.id, test_author.id] * 2
+        assert sorted(result["authors"]) == sorted([test_author.id, other.id])
+        assert result["authors"][other.id].name == "Otro autor"
+        assert result["next_cursor"] is None
+
+        page = book_services.get_books_keyset_cached(db_session, limit=4, normalized=True)
+        assert len(page["books"]) == 4
+        assert page["next_cursor"]
+
+    def test_write_paths_query_count(self, db_session: Session, test_author: Author):
+        """Test: Crear, modificar y borrar un libro cuesta 2, 2 y 1 sentencias SQL"""
+        # Sesión vacía, como al empezar una petición
+        db_session.expunge_all()
+
+        with metrics.collect() as stats:
+            book = book_services.create_book(db_session, CreateBookSchema(title="Rayuela", isbn="111", author_id=test_author.id))
+            BookOut.model_validate(book)
+        assert stats.queries == 2
+
+        db_session.expunge_all()
+        with metrics.collect() as stats:
+            updated = book_services.update_book(db_session, book.id, UpdateBookSchema(title="Final del juego"))
+            out = BookOut.model_validate(updated)
+        assert stats.queries == 2
+        assert out.title == "Final del juego"
+        assert out.author.id == test_author.id
+
+        db_session.expunge_all()
+        with metrics.collect() as stats:
+            book_services.delete_book(db_session, book.id)
+        assert stats.queries == 1
+        assert db_session.get(Book, book.id) is None
+
+    def test_update_book_duplicate_isbn(self, db_session: Session, test_author: Author):
+        """Test: Cambiar el ISBN por uno existente devuelve BadRequestError"""
+        book_services.create_book(db_session, CreateBookSchema(title="Rayuela", isbn="111", author_id=test_author.id))
+        other = book_services.create_book(db_session, CreateBookSchema(title="Bestiario", isbn="222", author_id=test_author.id))
+
+        with pytest.raises(BadRequestError, match="ISBN already exists"):
+            book_services.update_book(db_session, other.id, UpdateBookSchema(isbn="111"))
+
+    def test_book_stats_cached_by_version(self, db_session: Session, test_author: Author):
+        """Test: Las facetas se calculan una vez por versión de las tablas"""
+        response_cache.clear()
+        for i, (genre, year) in enumerate([("Novela", 1963), ("Novela", 1967), ("Cuento", None)]):
+            db_session.add(Book(title=f"Libro {i}", isbn=str(i), author_id=test_author.id, genre=genre,
+                                published_year=year, is_available=i != 0))
+        db_session.commit()
+
+        version = book_services.books_version(db_session)
+        stats = book_services.get_book_stats_cached(db_session, version)
+        assert stats.total == 3
+        assert [(f.value, f.count) for f in stats.by_availability] == [(True, 2), (False, 1)]
+        assert [(f.value, f.count) for f in stats.by_genre] == [("Novela", 2), ("Cuento", 1)]
+        assert [(f.value, f.count) for f in stats.by_decade] == [(None, 1), (1960, 2)]
+        assert [(a.name, a.count) for a in stats.by_author] == [(test_author.name, 3)]
+
+        with metrics.collect() as collected:
+            assert book_services.get_book_stats_cached(db_session, version) == stats
+        assert collected.queries == 0
+
+        book_services.delete_book(db_session, 1)
+        version = book_services.books_version(db_session)
+        assert book_services.get_book_stats_cached(db_session, version).total == 2
+        assert book_services.count_books_cached(db_session, version=version, filters=book_services.BookFilters(genre="Novela")) == 1
+
+    def test_get_books_batch_single_query(self, db_session: Session, test_author: Author):
+        """Test: 50 ids se resuelven con un solo IN (...) y después salen de la caché"""
+        response_cache.clear()
+        db_session.add_all([Book(title=f"Libro {i}", isbn=str(i), author_id=test_author.id) for i in range(50)])
+        db_session.commit()
+        db_session.expunge_all()
+        ids = list(range(50, 0, -1))
+
+        with metrics.collect() as stats:
+            result = book_services.get_books_batch_cached(db_session, ids + [100])
+        assert stats.queries == 1
+        assert [book.id for book in result["items"]] == ids
+        assert result["items"][0].author.id == test_author.id
+        assert result["missing"] == [100]
+
+        with metrics.collect() as stats:
+            book_services.get_books_batch_cached(db_session, ids[:10])
+        assert stats.queries == 0
+
+    def test_checkout_and_return(self, db_session: Session, test_author: Author):
+        """Test: Prestar y devolver es un único UPDATE condicional; repetirlo da ConflictError"""
+        book = book_services.create_book(db_session, CreateBookSchema(title="Rayuela", isbn="111", author_id=test_author.id))
+
+        with metrics.collect() as stats:
+            result = book_services.checkout_book(db_session, book.id)
+        assert stats.queries == 1
+        assert result.is_available is False
+
+        with pytest.raises(ConflictError, match="already checked out"):
+            book_services.checkout_book(db_session, book.id)
+        assert book_services.return_book(db_session, book.id).is_available is True
+        with pytest.raises(ConflictError, match="not checked out"):
+            book_services.return_book(db_session, book.id)
+        with pytest.raises(NotFoundError):
+            book_services.checkout_book(db_session, 999)
+
+    def test_concurrent_checkouts_single_winner(self, tmp_path):
+        """Test: Con muchos préstamos simultáneos del mismo libro solo uno tiene éxito"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'checkout.db'}", connect_args={"check_same_thread": False})
+        configure_sqlite(engine, sqlite_pragmas("wal"))
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+        with SessionLocal() as db:
+            author = Author(name="Autor")
+            db.add(author)
+            db.commit()
+            db.add(Book(title="Libro", isbn="1", author_id=author.id))
+            db.commit()
+
+        barrier = threading.Barrier(8)
+        outcomes = []
+
+        def borrow():
+            with SessionLocal() as db:
+                barrier.wait()
+                try:
+                    book_services.checkout_book(db, 1)
+                    outcomes.append("ok")
+                except ConflictError:
+                    outcomes.append("conflict")
+
+        threads = [threading.Thread(target=borrow) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+        assert sorted(outcomes) == ["conflict"] * 7 + ["ok"]
+
+    def test_bulk_create_books(self, db_session: Session, test_author: Author):
+        """Test: Importación masiva por lotes con errores por fila"""
+        db_session.add(Book(title="Existing", isbn="existing", author_id=test_author.id))
+        db_session.commit()
+        rows = [
+            {"title": "Book 0", "isbn": "isbn-0", "author_id": test_author.id},
+            {"title": "Book 1", "isbn": "existing", "author_id": test_author.id},
+            {"title": "Book 2", "isbn": "isbn-2", "author_id": 999},
+            {"title": "Book 3", "isbn": "isbn-0", "author_id": test_author.id},
+            {"isbn": "isbn-4", "author_id": test_author.id},
+            {"title": "Book 5", "isbn": "isbn-5", "author_id": test_author.id, "genre": "Cuento"},
+            '{"title": "Book 6", "isbn": "isbn-6", "author_id": %d}' % test_author.id,
+            "{no es json",
+        ]
+        
+        result = book_services.bulk_create_books(db_session, rows, chunk_size=3)
+        
+        assert result["created"] == 3
+        assert result["failed"] == 5
+        details = {error["index"]: error["detail"] for error in result["errors"]}
+        assert details[1] == "A book with this ISBN already exists"
+        assert details[2] == "Author not found"
+        assert details[3] == "A book with this ISBN already exists"
+        assert "title" in details[4]
+        assert details[7] == "Invalid JSON"
+        assert db_session.query(Book).count() == 4
+        # El índice de búsqueda también recibe las filas importadas
+        assert [b.isbn for b in book_services.get_books(db_session, search="book 5")] == ["isbn-5"]
+    
+    @staticmethod
+    def _concurrent_writer(author_id: int, isbn: str):
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            # Simula otro escritor que inserta `isbn` entre la validación y cada insert que lo lleva
+            # (en la misma conexión, así que el rollback del insert que choca también lo deshace)
+            rows = parameters if executemany else [parameters]
+            if statement.startswith("INSERT INTO books") and any(isbn in row for row in rows):
+                cursor.execute(
+                    "INSERT INTO books (title, isbn, author_id, is_available, created_at, updated_at) "
+                    "VALUES ('Otro', ?, ?, 1, '2024-01-01', '2024-01-01')", (isbn, author_id)
+                )
+        return listener
+
+    def _bulk_with_concurrent_writer(self, db_session: Session, author_id: int, isbn: str, rows: list, chunk_size: int):
+        bind = db_session.get_bind()
+        listener = self._concurrent_writer(author_id, isbn)
+        event.listen(bind, "before_cursor_execute", listener)
+        try:
+            return book_services.bulk_create_books(db_session, rows, chunk_size=chunk_size)
+        finally:
+            event.remove(bind, "before_cursor_execute", listener)
+
+    def test_bulk_conflict_while_inserting(self, db_session: Session, test_author: Author):
+        """Test: Si el insert del lote choca con otro escritor, solo falla la fila en conflicto y cada fila falla una vez"""
+        rows = [
+            {"title": "Book 0", "isbn": "dup", "author_id": test_author.id},
+            {"title": "Book 1", "isbn": "dup", "author_id": test_author.id},
+            {"title": "Book 2", "isbn": "c1", "author_id": test_author.id},
+            {"title": "Book 3", "isbn": "dup", "author_id": test_author.id},
+        ]
+        result = self._bulk_with_concurrent_writer(db_session, test_author.id, "c1", rows, chunk_size=3)
+
+        assert result["created"] == 1
+        assert result["failed"] == 3
+        assert [error["index"] for error in result["errors"]] == [1, 2, 3]
+        assert {error["detail"] for error in result["errors"]} == {"A book with this ISBN already exists"}
+        assert [book.isbn for book in db_session.query(Book).all()] == ["dup"]
+
+    def test_bulk_conflict_among_valid_rows(self, db_session: Session, test_author: Author):
+        """Test: Un ISBN duplicado por otro escritor dentro de un lote no hace fallar las filas válidas"""
+        rows = [
+            {"title": f"Book {i}", "isbn": isbn, "author_id": test_author.id}
+            for i, isbn in enumerate(["a1", "a2", "c1", "a3"])
+        ]
+        result = self._bulk_with_concurrent_writer(db_session, test_author.id, "c1", rows, chunk_size=4)
+
+        assert result["created"] == 3
+        assert result["failed"] == 1
+        assert result["errors"] == [{"index": 2, "isbn": "c1", "detail": "A book with this ISBN already exists"}]
+        assert sorted(book.isbn for book in db_session.query(Book).all()) == ["a1", "a2", "a3"]
+
     def test_get_book_by_id_success(self, db_session: Session, test_author: Author):
         """Test: Obtener libro por ID exitosamente"""
         book = Book(title="Test Book", isbn="123", author_id=test_author.id)
@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import zlib
+from fastapi.testclient import TestClient
+from models.author_model import Author
+from models.book_model import Book
+from core.compression import CompressionMiddleware, choose_encoding
+
+
+def run_asgi(app, headers: dict) -> list[dict]:
+    """Ejecuta una app ASGI y devuelve los mensajes enviados"""
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def streaming_app(chunks: list[bytes]):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+
+class TestCompression:
+    """Tests del middleware de compresión"""
+
+    def test_choose_encoding(self):
+        """Test: Se respeta q del cliente y, a igual q, el orden del servidor"""
+        assert choose_encoding("gzip, deflate", ("gzip",)) == "gzip"
+        assert choose_encoding("gzip;q=0, br", ("gzip",)) is None
+        assert choose_encoding("*", ("br", "gzip")) == "br"
+        assert choose_encoding("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+        assert choose_encoding(None, ("gzip",)) is None
+
+    def test_large_list_compressed(self, client: TestClient, test_user_token: str, db_session):
+        """Test: Un listado grande sale en gzip con el mismo JSON"""
+        db_session.add_all([Author(name=f"Autor {i}", nationality="Chilena") for i in range(50)])
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+
+        plain = client.get("/api/authors/", headers={**headers, "Accept-Encoding": "identity"})
+        response = client.get("/api/authors/", headers={**headers, "Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in plain.headers
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(plain.content) / 3
+        assert response.json() == plain.json()
+        # El ETag pasa a débil y sigue sirviendo para un 304
+        etag = response.headers["etag"]
+        assert etag == f"W/{plain.headers['etag']}"
+        response = client.get("/api/authors/", headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_small_response_not_compressed(self, client: TestClient, test_user_token: str):
+        """Test: Por debajo de COMPRESSION_MIN_SIZE la respuesta sale tal cual"""
+        response = client.get(
+            "/api/authors/", headers={"Authorization": f"Bearer {test_user_token}", "Accept-Encoding": "gzip"}
+        )
+        assert response.json() == []
+        assert "content-encoding" not in response.headers
+
+    def test_streamed_export_compressed(self, client: TestClient, test_user_token: str, db_session):
+        """Test: La exportación en streaming se comprime sin Content-Length"""
+        author = Author(name="Autor")
+        db_session.add(author)
+        db_session.commit()
+        db_session.add_all([Book(title=f"Libro {i}", isbn=f"isbn-{i}", author_id=author.id) for i in range(200)])
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+
+        plain = client.get("/api/books/export?format=ndjson", headers={**headers, "Accept-Encoding": "identity"})
+        response = client.get("/api/books/export?format=ndjson", headers={**headers, "Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.content == plain.content
+
+    def test_stream_chunks_flushed(self):
+        """Test: Cada trozo del stream se puede descomprimir al llegar"""
+        chunks = [b'{"id": %d}\n' % i * 50 for i in range(3)]
+        messages = run_asgi(CompressionMiddleware(streaming_app(chunks), minimum_size=10), {"accept-encoding": "gzip"})
+
+        start, *bodies = messages
+        assert (b"content-encoding", b"gzip") in start["headers"]
+        assert len(bodies) == 4
+        decompressor = zlib.decompressobj(31)
+        for chunk, message in zip(chunks, bodies):
+            assert decompressor.decompress(message["body"]) == chunk
+        assert gzip.decompress(b"".join(message["body"] for message in bodies)) == b"".join(chunks)
+
+    def test_content_type_allowlist(self):
+        """Test: Los tipos fuera de la lista no se comprimen"""
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"image/png")]})
+            await send({"type": "http.response.body", "body": b"x" * 5000})
+
+        start, body = run_asgi(CompressionMiddleware(app), {"accept-encoding": "gzip"})
+        assert body["body"] == b"x" * 5000
+        assert all(name != b"content-encoding" for name, _ in start["headers"])
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from core import metrics
+from models.author_model import Author
+from routes import metrics_router
+
+
+class TestRequestInstrumentation:
+    """Tests del middleware de métricas y los hooks del engine"""
+
+    def test_server_timing_header(self, client: TestClient, test_user_token: str):
+        """Test: Las respuestas llevan Server-Timing con tiempo y número de queries"""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        client.post("/api/authors/", json={"name": "Gabriel García Márquez"}, headers=headers)
+        response = client.get("/api/authors/", headers=headers)
+
+        assert response.status_code == 200
+        timing = response.headers["server-timing"]
+        assert timing.startswith("db;dur=")
+        assert "auth;dur=" in timing
+        assert "total;dur=" in timing
+        assert '"0 queries"' not in timing
+
+    def test_queries_counted_per_request(self, db_session: Session):
+        """Test: Los hooks del engine suman queries y detectan sentencias repetidas (N+1)"""
+        with metrics.collect() as stats:
+            for author_id in range(1, metrics.N_PLUS_ONE_THRESHOLD + 1):
+                db_session.execute(select(Author).where(Author.id == author_id)).all()
+            db_session.execute(text("SELECT 1"))
+
+        assert stats.queries == metrics.N_PLUS_ONE_THRESHOLD + 1
+        assert stats.db_time > 0
+        assert len(stats.n_plus_one()) == 1
+
+    def test_failed_statements_do_not_leak(self, db_session: Session):
+        """Test: Las sentencias que fallan se cuentan y no dejan su inicio en la conexión"""
+        db_session.add(Author(name="Autor"))
+        db_session.commit()
+        connection = db_session.connection()
+
+        with metrics.collect() as stats:
+            for _ in range(3):
+                with pytest.raises(IntegrityError):
+                    connection.execute(text("INSERT INTO authors (id, name) VALUES (1, 'Otro')"))
+
+        assert stats.queries == 3
+        assert connection.info.get("query_start") == []
+
+    def test_queries_outside_request_ignored(self, db_session: Session):
+        """Test: Sin petición en curso los hooks no registran nada"""
+        db_session.execute(text("SELECT 1"))
+        assert metrics.current() is None
+
+    def test_span_propagates_to_async_code(self):
+        """Test: El ContextVar de la petición llega a las corrutinas"""
+        async def scenario():
+            with metrics.span("work"):
+                await asyncio.sleep(0)
+
+        with metrics.collect() as stats:
+            asyncio.run(scenario())
+
+        assert "work" in stats.spans
+
+
+class TestMetricsEndpoint:
+    """Tests del endpoint /metrics"""
+
+    def test_metrics_rejects_remote_clients(self, client: TestClient):
+        """Test: /metrics solo responde a los hosts permitidos"""
+        response = client.get("/metrics")
+        assert response.status_code == 404
+
+    def test_metrics_prometheus_format(self, client: TestClient, monkeypatch):
+        """Test: /metrics expone histogramas por ruta y las estadísticas de cachés y pool"""
+        monkeypatch.setattr(metrics_router, "METRICS_ALLOWED_HOSTS", {"testclient"})
+        client.get("/api/books/")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/api/books/",status="403",le="+Inf"}' in body
+        assert "# TYPE http_request_db_queries histogram" in body
+        assert "auth_cache_hits " in body
+        assert 'response_cache_size{cache="books"}' in body
+        assert "hashing_pool_queue_depth " in body
+        assert 'db_pool_checked_out{pool="write"}' in body
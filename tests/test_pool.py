@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from db import db
+from db.pool import InstrumentedQueuePool, pool_stats
+
+
+@pytest.fixture
+def small_pool(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=1, pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestPool:
+    """Tests del pool de conexiones instrumentado"""
+
+    def test_pool_options_from_env(self, monkeypatch):
+        """Test: Tamaño, overflow, timeout y pre-ping se leen por prefijo; en memoria no hay pool configurable"""
+        monkeypatch.setenv("READ_DB_POOL_SIZE", "3")
+        monkeypatch.setenv("READ_DB_POOL_PRE_PING", "true")
+        options = db.pool_options("sqlite:///db/library.db", "READ_DB", 10, 20)
+
+        assert options["pool_size"] == 3
+        assert options["max_overflow"] == 20
+        assert options["pool_timeout"] == 30
+        assert options["pool_pre_ping"] is True
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert db.pool_options("sqlite:///:memory:", "DB", 5, 10) == {}
+
+    def test_session_checks_out_lazily(self, small_pool):
+        """Test: Una sesión sin consultas no toma ninguna conexión del pool"""
+        with Session(small_pool) as session:
+            assert small_pool.pool.stats()["checkouts"] == 0
+            session.execute(text("SELECT 1"))
+            assert small_pool.pool.stats()["checked_out"] == 1
+
+        assert small_pool.pool.stats()["checkouts"] == 1
+        assert small_pool.pool.stats()["checked_out"] == 0
+
+    def test_get_read_db_without_queries(self):
+        """Test: get_read_db no ocupa conexión si la ruta no consulta (p. ej. token en caché)"""
+        before = db.read_engine.pool.stats()["checkouts"]
+        dependency = db.get_read_db()
+        next(dependency)
+        dependency.close()
+
+        assert db.read_engine.pool.stats()["checkouts"] == before
+
+    def test_overflow_and_timeout_counted(self, small_pool):
+        """Test: Las conexiones por encima de pool_size y las esperas agotadas quedan registradas"""
+        first = small_pool.connect()
+        second = small_pool.connect()
+        with pytest.raises(PoolTimeoutError):
+            small_pool.connect()
+
+        stats = small_pool.pool.stats()
+        assert stats["checked_out"] == 2
+        assert stats["overflow_events"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["max_wait_seconds"] >= 0.05
+        first.close()
+        second.close()
+
+        # dispose() recrea el pool sin perder los contadores
+        small_pool.dispose()
+        assert small_pool.pool.stats()["checkouts"] == 2
+
+    def test_registered_pools(self):
+        """Test: Los motores de lectura y escritura publican sus estadísticas"""
+        assert {"write", "read"} <= set(pool_stats())
@@ -0,0 +1,169 @@
+import re
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from db.db import ensure_indexes
+from models.author_model import Author
+from models.book_model import Book
+from schemas.author_schema import UpdateAuthorSchema
+from schemas.book_schema import CreateBookSchema, UpdateBookSchema
+from services import table_versions
+from services.authors import author_services
+from services.books import book_services
+from services.books.book_services import BookFilters
+from services.exceptions import BadRequestError
+from services.pagination import encode_cursor
+
+_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@contextmanager
+def captured_statements(db: Session):
+    """Guarda las sentencias SQL (con sus parámetros) que ejecuta la sesión"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", capture)
+
+
+def full_scans(db: Session, statements) -> set[str]:
+    """Tablas que EXPLAIN QUERY PLAN recorre enteras (SCAN) en alguna sentencia"""
+    scanned = set()
+    connection = db.connection()
+    for statement, parameters in statements:
+        for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+            detail = row[-1]
+            match = _SCAN.match(detail)
+            # Las subconsultas materializadas (anon_N) ya se cuentan por sus propias tablas
+            if match and "VIRTUAL TABLE" not in detail and match.group(1) != "CONSTANT" and not match.group(1).startswith("anon_"):
+                scanned.add(match.group(1))
+    return scanned
+
+
+# Caso -> (llamada al servicio, tablas que puede recorrer enteras y por qué).
+# Los listados sin filtro recorren la tabla en orden de id y paran en LIMIT;
+# title usa LIKE '%...%', que no puede usar un índice.
+CASES = {
+    "get_books": (lambda db: book_services.get_books(db), {"books"}),
+    "get_books.available": (lambda db: book_services.get_books(db, isAvailable=True), set()),
+    "get_books.title": (lambda db: book_services.get_books(db, title="Libro"), {"books"}),
+    "get_books.search": (lambda db: book_services.get_books(db, search="novela"), set()),
+    "get_books.normalized": (lambda db: book_services.get_books(db, normalized=True), {"books"}),
+    "get_books_keyset.available": (
+        lambda db: book_services.get_books_keyset(db, isAvailable=True, cursor=encode_cursor({"id": 2})), set()
+    ),
+    "get_books.genre": (lambda db: book_services.get_books(db, filters=BookFilters(genre="Novela")), set()),
+    "get_books.genre_years": (
+        lambda db: book_services.get_books(db, filters=BookFilters(genre="Novela", year_from=2001, year_to=2003)), set()
+    ),
+    "get_books.author": (lambda db: book_services.get_books(db, filters=BookFilters(author_id=1)), set()),
+    "get_books.years": (lambda db: book_services.get_books(db, filters=BookFilters(year_from=2001, year_to=2003)), set()),
+    "get_books.isbn_prefix": (lambda db: book_services.get_books(db, filters=BookFilters(isbn_prefix="plan-")), set()),
+    "get_books.available_author": (
+        lambda db: book_services.get_books(db, isAvailable=True, filters=BookFilters(author_id=2)), set()
+    ),
+    # Ordenar sin filtro recorre el índice de la columna de orden y para en LIMIT
+    "get_books.sort_year": (lambda db: book_services.get_books(db, filters=BookFilters(sort="-published_year")), {"books"}),
+    "get_books_keyset.genre_sort_year": (
+        lambda db: book_services.get_books_keyset(
+            db, cursor=encode_cursor({"id": 2, "sort": "published_year", "value": 2002}),
+            filters=BookFilters(genre="Novela", sort="published_year"),
+        ), set()
+    ),
+    "get_books_keyset.author_sort_isbn": (
+        lambda db: book_services.get_books_keyset(
+            db, cursor=encode_cursor({"id": 1, "sort": "-isbn", "value": "plan-4"}), filters=BookFilters(author_id=1)
+        ), set()
+    ),
+    "count_books.author": (lambda db: book_services.count_books(db, filters=BookFilters(author_id=1)), set()),
+    # Los agregados leen todas las filas, pero de un índice que los cubre y nunca de la tabla
+    "get_book_stats": (lambda db: book_services.get_book_stats(db), {"books"}),
+    "get_book_by_id": (lambda db: book_services.get_book_by_id(db, 1), set()),
+    "get_books_by_ids": (lambda db: book_services.get_books_by_ids(db, [3, 1, 5]), set()),
+    "create_book": (
+        lambda db: book_services.create_book(db, CreateBookSchema(title="Nuevo", isbn="plan-new", author_id=1)), set()
+    ),
+    "update_book": (lambda db: book_services.update_book(db, 1, UpdateBookSchema(title="Otro", author_id=2)), set()),
+    "delete_book": (lambda db: book_services.delete_book(db, 3), set()),
+    "books_version": (lambda db: book_services.books_version(db), set()),
+    "get_authors": (lambda db: author_services.get_authors(db), {"authors"}),
+    "get_authors.nationality": (lambda db: author_services.get_authors(db, nationality="Chilena"), set()),
+    "get_authors.name_prefix": (lambda db: author_services.get_authors(db, name_prefix="Autor"), set()),
+    "get_author_by_id": (lambda db: author_services.get_author_by_id(db, 1), set()),
+    "get_authors_by_ids": (lambda db: author_services.get_authors_by_ids(db, [2, 1]), set()),
+    "update_author": (lambda db: author_services.update_author(db, 1, UpdateAuthorSchema(name="Otro")), set()),
+    "delete_author.with_books": (lambda db: author_services.delete_author(db, 1), set()),
+}
+
+
+class TestQueryPlans:
+    """Tests de regresión de los planes de consulta (EXPLAIN QUERY PLAN)"""
+
+    @pytest.fixture
+    def seeded(self, db_session: Session):
+        db_session.add_all([Author(name="Autor A", nationality="Chilena"), Author(name="Autor B")])
+        db_session.commit()
+        db_session.add_all([
+            Book(title=f"Libro {i}", isbn=f"plan-{i}", author_id=1 + i % 2, genre="Novela", published_year=2000 + i)
+            for i in range(6)
+        ])
+        db_session.commit()
+        return db_session
+
+    @pytest.mark.parametrize("name", CASES)
+    def test_no_unexpected_full_scan(self, seeded: Session, name: str):
+        """Test: Ninguna consulta del servicio recorre una tabla entera salvo las permitidas"""
+        call, allowed = CASES[name]
+        with captured_statements(seeded) as statements:
+            try:
+                call(seeded)
+            except BadRequestError:
+                # delete_author con libros falla a propósito: interesa su plan
+                pass
+
+        assert statements
+        assert full_scans(seeded, statements) <= allowed
+
+    def test_sorted_listing_uses_index_order(self, seeded: Session):
+        """Test: Filtrar por género y ordenar por año sale del índice, sin ordenar en memoria"""
+        with captured_statements(seeded) as statements:
+            book_services.get_books(seeded, filters=BookFilters(genre="Novela", sort="published_year"))
+
+        statement, parameters = statements[0]
+        plan = [row[-1] for row in seeded.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        assert any("ix_books_genre_published_year" in detail for detail in plan)
+        assert not any("TEMP B-TREE" in detail for detail in plan)
+
+    def test_stats_read_covering_indexes(self, seeded: Session):
+        """Test: Cada faceta de /books/stats se resuelve con un índice que la cubre"""
+        connection = seeded.connection()
+        for statement in book_services.stats_statements().values():
+            compiled = statement.compile(seeded.get_bind())
+            plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", tuple(compiled.params.values()))]
+            scans = [detail for detail in plan if detail.startswith("SCAN books")]
+            assert scans and all("COVERING INDEX" in detail for detail in scans), plan
+
+    def test_join_and_delete_check_use_author_index(self, seeded: Session):
+        """Test: Los libros de un autor se buscan por ix_books_author_id"""
+        statement = author_services.delete_author_statement(1).compile(seeded.get_bind())
+        plan = seeded.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", (1, 1)).all()
+        assert any("ix_books_author_id" in row[-1] for row in plan)
+
+    def test_ensure_indexes_on_existing_database(self, db_session: Session):
+        """Test: init_db crea los índices nuevos en una base ya existente"""
+        bind = db_session.get_bind()
+        db_session.connection().exec_driver_sql("DROP INDEX ix_books_author_id")
+        db_session.commit()
+        assert "ix_books_author_id" not in {index["name"] for index in inspect(bind).get_indexes("books")}
+
+        ensure_indexes(bind)
+        assert "ix_books_author_id" in {index["name"] for index in inspect(bind).get_indexes("books")}
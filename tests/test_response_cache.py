@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from services import cache as response_cache
+from services.books import book_services
+from services.authors import author_services
+from schemas.author_schema import UpdateAuthorSchema
+from schemas.book_schema import CreateBookSchema, UpdateBookSchema
+from models.author_model import Author
+
+
+class TestResponseCache:
+    """Tests de la caché de lecturas de libros y autores"""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        response_cache.clear()
+        yield
+        response_cache.clear()
+
+    @pytest.fixture
+    def test_author(self, db_session: Session):
+        author = Author(name="Test Author", nationality="Test")
+        db_session.add(author)
+        db_session.commit()
+        db_session.refresh(author)
+        return author
+
+    def test_book_read_through_and_invalidation(self, db_session: Session, test_author: Author):
+        """Test: La segunda lectura sale de caché y una escritura la invalida"""
+        book = book_services.create_book(db_session, CreateBookSchema(title="Rayuela", isbn="111", author_id=test_author.id))
+
+        hits = response_cache.book_cache.stats()["hits"]
+        first = book_services.get_book_cached(db_session, book.id)
+        second = book_services.get_book_cached(db_session, book.id)
+        assert first is second
+        assert response_cache.book_cache.stats()["hits"] == hits + 1
+
+        book_services.update_book(db_session, book.id, UpdateBookSchema(title="Rayuela (2ª ed.)"))
+        assert book_services.get_book_cached(db_session, book.id).title == "Rayuela (2ª ed.)"
+
+    def test_author_update_invalidates_embedded_books(self, db_session: Session, test_author: Author):
+        """Test: Cambiar un autor invalida los libros y listados que lo incrustan"""
+        book = book_services.create_book(db_session, CreateBookSchema(title="Rayuela", isbn="111", author_id=test_author.id))
+        book_services.get_book_cached(db_session, book.id)
+        book_services.get_books_cached(db_session)
+
+        author_services.update_author(db_session, test_author.id, UpdateAuthorSchema(name="Julio Cortázar"))
+
+        assert book_services.get_book_cached(db_session, book.id).author.name == "Julio Cortázar"
+        assert book_services.get_books_cached(db_session)[0].author.name == "Julio Cortázar"
+
+    def test_list_key_is_normalized(self, db_session: Session, test_author: Author):
+        """Test: Consultas equivalentes comparten entrada en la caché de listados"""
+        book_services.get_books_cached(db_session, title="Cien ")
+        book_services.get_books_cached(db_session, title="cien")
+
+        stats = response_cache.list_cache.stats()
+        assert stats["size"] == 1
+        assert stats["bytes"] > 0
+
+    def test_create_invalidates_lists(self, db_session: Session, test_author: Author):
+        """Test: Crear un libro invalida los listados cacheados"""
+        assert book_services.get_books_cached(db_session) == []
+        book_services.create_book(db_session, CreateBookSchema(title="Rayuela", isbn="111", author_id=test_author.id))
+        assert len(book_services.get_books_cached(db_session)) == 1
+
+    def test_cache_stats_endpoint(self, client: TestClient, test_user_token: str):
+        """Test: GET /api/cache/stats reporta aciertos y memoria por caché"""
+        headers = {"Authorization": f"Bearer {test_user_token}"}
+        before = response_cache.list_cache.stats()
+        client.get("/api/authors/", headers=headers)
+        client.get("/api/authors/", headers=headers)
+
+        response = client.get("/api/cache/stats", headers=headers)
+
+        assert response.status_code == 200
+        lists = response.json()["lists"]
+        assert lists["hits"] == before["hits"] + 1
+        assert lists["misses"] == before["misses"] + 1
+        assert lists["size"] == 1
+        assert {"hit_ratio", "bytes"} <= set(lists)
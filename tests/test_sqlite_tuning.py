@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from db.db import READ_PRAGMAS, read_only_url
+from db.sqlite_tuning import sqlite_pragmas, configure_sqlite
+
+
+class TestSqliteTuning:
+    """Tests del perfil de PRAGMAs de SQLite"""
+
+    def test_off_profile_has_no_pragmas(self):
+        """Test: El perfil 'off' deja los valores por defecto de SQLite"""
+        assert sqlite_pragmas("off") == {}
+
+    def test_env_override(self, monkeypatch):
+        """Test: Una variable de entorno sobrescribe un PRAGMA del perfil"""
+        monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "1234")
+        pragmas = sqlite_pragmas("wal")
+
+        assert pragmas["busy_timeout"] == 1234
+        assert pragmas["journal_mode"] == "WAL"
+
+    def test_invalid_values_rejected(self, monkeypatch):
+        """Test: Perfiles o valores desconocidos fallan al arrancar"""
+        with pytest.raises(ValueError):
+            sqlite_pragmas("turbo")
+
+        monkeypatch.setenv("SQLITE_SYNCHRONOUS", "sometimes")
+        with pytest.raises(ValueError):
+            sqlite_pragmas("wal")
+
+    def test_pragmas_applied_on_connect(self, tmp_path):
+        """Test: Las conexiones nuevas salen con WAL y busy_timeout aplicados"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'tuning.db'}")
+        configure_sqlite(engine, sqlite_pragmas("wal"))
+
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        engine.dispose()
+
+    def test_read_only_url(self):
+        """Test: El motor de lectura abre el mismo fichero en mode=ro; en memoria no hay réplica"""
+        assert read_only_url("sqlite:///db/library.db") == "sqlite:///file:db/library.db?mode=ro&uri=true"
+        assert read_only_url("sqlite+aiosqlite:////tmp/x.db") == "sqlite+aiosqlite:///file:/tmp/x.db?mode=ro&uri=true"
+        assert read_only_url("sqlite:///:memory:") is None
+        assert read_only_url("postgresql://user@host/library") is None
+
+    def test_read_engine_not_blocked_by_writer(self, tmp_path):
+        """Test: Con una escritura en curso el lector lee lo confirmado y no puede escribir"""
+        url = f"sqlite:///{tmp_path / 'routing.db'}"
+        writer = create_engine(url)
+        configure_sqlite(writer, sqlite_pragmas("wal"))
+        reader = create_engine(read_only_url(url))
+        configure_sqlite(reader, READ_PRAGMAS)
+        with writer.begin() as connection:
+            connection.execute(text("CREATE TABLE t (a INTEGER)"))
+            connection.execute(text("INSERT INTO t VALUES (1)"))
+
+        with writer.begin() as write, reader.connect() as read:
+            write.execute(text("INSERT INTO t VALUES (2)"))
+            assert read.execute(text("SELECT count(*) FROM t")).scalar() == 1
+            with pytest.raises(OperationalError):
+                read.execute(text("INSERT INTO t VALUES (3)"))
+        with reader.connect() as read:
+            assert read.execute(text("SELECT count(*) FROM t")).scalar() == 2
+        writer.dispose()
+        reader.dispose()